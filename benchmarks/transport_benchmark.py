@@ -0,0 +1,86 @@
+import argparse
+import queue
+import time
+
+from demo.core_ble.application import Application
+from demo.core_ble.memory_transport import MemoryTransport
+from demo.core_ble.service import Service
+from demo.core_ble.transport import Transport
+
+
+def create_transport(name: str) -> Transport:
+    """
+    Creates the transport with the given name, the dbus transport exports the objects on the session bus.
+
+    Args:
+        name (str): "memory" or "dbus"
+
+    Returns:
+        Transport: transport to benchmark
+    """
+    if name == "memory":
+        return MemoryTransport()
+
+    from demo.core_ble.dbus_transport import create_dbus_transport
+
+    return create_dbus_transport("session")
+
+
+def run_benchmark(transport: Transport, characteristic_count: int, rounds: int, value_size: int) -> float:
+    """
+    Runs the notification workload: every round writes a new value to all characteristics with one write_many and
+    sends all notifications in one scheduler pass.
+
+    Args:
+        transport (Transport): transport to benchmark
+        characteristic_count (int): number of notifying characteristics
+        rounds (int): number of write_many calls
+        value_size (int): size of each value in bytes
+
+    Returns:
+        float: notifications per second
+    """
+    app = Application(transport)
+    # the default scheduler like BLEProcess uses it, a batch is sent in one pass regardless of the link budget
+    scheduler = app.scheduler
+    service = Service(transport, 0, "0000180d-aaaa-1000-8000-0081239b35fb", True, queue.Queue(), scheduler)
+
+    uuids = [f"f76ce015-952b-c6a8-e17c-c2c19aac{index:04x}" for index in range(characteristic_count)]
+    for uuid in uuids:
+        service.add_characteristic(uuid, ["read", "notify"], "Benchmark Characteristic", "0")
+        service.characteristics_by_uuid[uuid].start_notify()
+    app.add_service(service)
+
+    start = time.perf_counter()
+    sent = scheduler.sent_count
+    for index in range(rounds):
+        value = str(index).rjust(value_size, "0")
+        service.write_many({uuid: value for uuid in uuids})
+    elapsed = time.perf_counter() - start
+
+    return (scheduler.sent_count - sent) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Notification throughput of the GATT model per transport")
+    parser.add_argument("--transport", choices=["memory", "dbus", "all"], default="all")
+    parser.add_argument("--characteristics", type=int, default=30)
+    parser.add_argument("--rounds", type=int, default=1000)
+    parser.add_argument("--value-size", type=int, default=20)
+    args = parser.parse_args()
+
+    names = ["memory", "dbus"] if args.transport == "all" else [args.transport]
+
+    for name in names:
+        try:
+            transport = create_transport(name)
+        except Exception as error:
+            print(f"{name}: not available ({error})")
+            continue
+
+        rate = run_benchmark(transport, args.characteristics, args.rounds, args.value_size)
+        print(f"{name}: {rate:.0f} notifications/s")
+
+
+if __name__ == "__main__":
+    main()
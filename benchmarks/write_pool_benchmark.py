@@ -0,0 +1,99 @@
+import argparse
+import hashlib
+import os
+import queue
+import time
+from typing import Optional, Tuple
+
+from demo.core_ble.memory_transport import MemoryTransport
+from demo.core_ble.scheduler import NotificationScheduler
+from demo.core_ble.service import Service
+from demo.write_pool import WriteWorkerPool
+
+UUID_BASE = "f76ce015-952b-c6a8-e17c-c2c19aac"
+ITERATIONS = 20000
+
+
+def parse_command(payload: bytes) -> str:
+    """
+    CPU heavy write handler, derives a key from the written command.
+
+    Args:
+        payload (bytes): written command
+
+    Returns:
+        str: hex digest of the derived key
+    """
+    return hashlib.pbkdf2_hmac("sha256", payload, b"pycon_demo", ITERATIONS).hex()[:16]
+
+
+def run_benchmark(worker_count: Optional[int], characteristic_count: int, writes: int) -> Tuple[float, float]:
+    """
+    Writes to the characteristics and waits until all results are back.
+
+    Args:
+        worker_count (Optional[int]): number of worker processes, None to handle the writes inline on the main loop
+        characteristic_count (int): number of command characteristics
+        writes (int): number of writes
+
+    Returns:
+        Tuple[float, float]: handled writes per second and mean time in µs until a write is acknowledged
+    """
+    uuids = [f"{UUID_BASE}{index:04x}" for index in range(characteristic_count)]
+
+    write_pool = None
+    if worker_count is not None:
+        write_pool = WriteWorkerPool({uuid: parse_command for uuid in uuids}, worker_count)
+        write_pool.start()
+
+    transport = MemoryTransport()
+    scheduler = NotificationScheduler(transport)
+    service = Service(
+        transport, 0, "0000180d-aaaa-1000-8000-0081239b35fb", True, queue.Queue(), scheduler, write_pool=write_pool
+    )
+    for uuid in uuids:
+        service.add_characteristic(uuid, ["write", "notify"], "Command Characteristic", "")
+    characteristics = [service.characteristics_by_uuid[uuid] for uuid in uuids]
+
+    start = time.perf_counter()
+    ack_time = 0.0
+    received = 0
+    for index in range(writes):
+        write_start = time.perf_counter()
+        characteristics[index % characteristic_count].write_value(str(index).encode("ascii"), {})
+        if write_pool is None:
+            # inline the handler runs before the write returns to the client
+            parse_command(service.output_queue.get(False)["value"].encode("ascii"))
+            received += 1
+        ack_time += time.perf_counter() - write_start
+
+    # poll for results like the main loop does instead of spinning on a core the workers need
+    while received < writes:
+        received += sum(1 for _ in write_pool.results())
+        time.sleep(0.001)
+    elapsed = time.perf_counter() - start
+
+    if write_pool is not None:
+        write_pool.stop()
+
+    return writes / elapsed, ack_time / writes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of CPU heavy write handlers per number of worker processes")
+    parser.add_argument("--characteristics", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=400)
+    args = parser.parse_args()
+
+    rate, ack = run_benchmark(None, args.characteristics, args.writes)
+    print(f"inline: {rate:.0f} writes/s, {ack:.0f} µs until acknowledged")
+
+    worker_count = 1
+    while worker_count <= (os.cpu_count() or 1):
+        rate, ack = run_benchmark(worker_count, args.characteristics, args.writes)
+        print(f"{worker_count} workers: {rate:.0f} writes/s, {ack:.0f} µs until acknowledged")
+        worker_count *= 2
+
+
+if __name__ == "__main__":
+    main()
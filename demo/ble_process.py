@@ -1,87 +1,167 @@
 import enum
+import multiprocessing
 import queue
 from multiprocessing import Process
 from signal import SIGINT, SIGTERM, signal
-
-import dbus
-import dbus.exceptions
-import dbus.mainloop.glib
-import dbus.service
-from gi.repository import GLib
+from typing import Any, Callable, Dict, Optional
 
 from demo.core_ble.advertisement import Advertisement
 from demo.core_ble.application import Application
-from demo.core_ble.constants import BLUEZ_SERVICE_NAME, GATT_MANAGER_IFACE
 from demo.core_ble.service import Service
-from demo.exceptions import BluetoothNotFoundException
-from demo.util import find_adapter
-
-
-def register_app_cb():
-    print("Bluetooth service registered")
-
-
-def register_app_error_cb(error):
-    print("Failed to register application: " + str(error))
+from demo.util import value_to_bytes
+from demo.write_pool import WriteWorkerPool
 
 
 class BLEProcess(Process):
-    def __init__(self, output_queue: queue.Queue) -> None:
+    def __init__(
+        self,
+        output_queue: queue.Queue,
+        write_handlers: Optional[Dict[str, Callable[[bytes], Any]]] = None,
+        write_workers: Optional[int] = None,
+    ) -> None:
+        """
+        Constructor of the BLE process.
+
+        Args:
+            output_queue (queue.Queue): queue that receives the values written to the characteristics
+            write_handlers (Optional[Dict[str, Callable[[bytes], Any]]]): handlers per characteristic UUID that run in a
+                pool of worker processes. Writes to these characteristics are acknowledged right away, the results of
+                the handlers are put into the output queue and written back to the characteristic.
+            write_workers (Optional[int]): number of worker processes for the write handlers, defaults to the number
+                of cores
+        """
         super().__init__()
-        self._system_bus = None
-        self._mainloop = None
+        self._transport = None
+        self._write_pool = None
+        self._write_handlers = write_handlers
+        self._write_workers = write_workers
         self._advertisement = None
+        self._app = None
         self._output_queue = output_queue
+        # batches of values written by the parent process, each batch is applied in one main loop dispatch
+        self._input_queue = multiprocessing.Queue()
 
     def _shutdown_handler(self, sig: enum, frame: enum) -> None:
         """
         Handler that stops the main loop and stop the advertisements.
         """
-        self._mainloop.quit()
+        self._transport.quit()
         self._advertisement.release()
+        if self._write_pool is not None:
+            self._write_pool.stop()
+
+    def write_many(self, values: Dict[str, Any]) -> None:
+        """
+        Writes values to several characteristics at once. Can be called from the parent process, the values are
+        applied together in the BLE process and their notifications are sent back to back.
+
+        Args:
+            values (Dict[str, Any]): values to write by UUID of the characteristic
+        """
+        self._input_queue.put(dict(values))
+
+    def _input_queue_callback(self) -> bool:
+        """
+        Applies all batches of values the parent process has written since the last call.
+
+        Returns:
+            bool: True to keep the timer running
+        """
+        while True:
+            try:
+                values = self._input_queue.get(False)
+            except queue.Empty:
+                return True
+
+            try:
+                self._app.write_many(values)
+            except ValueError as error:
+                print(f"Failed to write values: {error}")
+
+    def _write_results(self, values: Dict[str, bytes]) -> None:
+        """
+        Writes a batch of handler results back to their characteristics and notifies them.
+
+        Args:
+            values (Dict[str, bytes]): encoded results by UUID of the characteristic
+        """
+        try:
+            self._app.write_many(values)
+        except ValueError as error:
+            print(f"Failed to write results: {error}")
+
+    def _write_results_callback(self) -> bool:
+        """
+        Passes the results of the write handlers to the output queue and writes them back to their characteristics,
+        so subscribed clients are notified. Every result is notified in the order it arrived, results for different
+        characteristics are written in one batch until a characteristic gets a second result.
+
+        Returns:
+            bool: True to keep the timer running
+        """
+        values = {}
+        for uuid, result in self._write_pool.results():
+            self._output_queue.put({"uuid": uuid, "value": result})
+            if result is None:
+                continue
+
+            # encode each result on its own, so one bad result does not reject the others of the batch
+            try:
+                result = value_to_bytes(result)
+            except ValueError as error:
+                print(f"Failed to write result of characteristic {uuid}: {error}")
+                continue
+
+            if uuid in values:
+                self._write_results(values)
+                values = {}
+            values[uuid] = result
+
+        if values:
+            self._write_results(values)
+        return True
 
     def run(self) -> None:
         """
         The main run function that set-ups the BLE service.
         """
 
-        # The mainloop initialized here handles the asynchronous communication over dbus documentation can be found
-        # here: https://docs.gtk.org/glib/main-loop.html
-        self._mainloop = GLib.MainLoop()
-
         # register shutdown handler
         signal(SIGTERM, self._shutdown_handler)
         signal(SIGINT, self._shutdown_handler)
 
-        # create the shared system bus object and find the main bluez adapter
-        self._system_bus = dbus.SystemBus()
-        adapter = find_adapter(self._system_bus)
-
-        if not adapter:
-            raise BluetoothNotFoundException()
-
-        adapter_obj = self._system_bus.get_object(bus_name=BLUEZ_SERVICE_NAME, object_path=adapter)
+        # export the GATT objects on the system bus, the transport finds the main bluez adapter. dbus is imported
+        # here, so the module can be imported on machines without dbus-python
+        from demo.core_ble.dbus_transport import create_dbus_transport
 
-        service_manager = dbus.Interface(adapter_obj, GATT_MANAGER_IFACE)
+        self._transport = create_dbus_transport()
 
         # Create the advertisement
         self._advertisement = Advertisement(
-            bus=self._system_bus,
+            transport=self._transport,
             index=0,
-            adapter_obj=adapter_obj,
             uuid="0000180d-aaaa-1000-8000-0081239b35fb",
             name="pycon_demo_service",
         )
 
         # Create the application and add the service to it
-        app = Application(self._system_bus)
+        app = Application(self._transport)
+        self._app = app
+
+        # CPU heavy write handlers run in worker processes to not block the main loop
+        if self._write_handlers:
+            self._write_pool = WriteWorkerPool(self._write_handlers, self._write_workers)
+            self._write_pool.start()
+            self._transport.timeout_add(10, self._write_results_callback)
 
         example_service = Service(
-            bus=self._system_bus,
+            transport=self._transport,
             index=0,
             uuid="0000180d-aaaa-1000-8000-0081239b35fb",
             primary=True,
             output_queue=self._output_queue,
+            scheduler=app.scheduler,
+            write_pool=self._write_pool,
         )
 
         example_service.add_characteristic(
@@ -90,16 +170,14 @@ class BLEProcess(Process):
 
         app.add_service(example_service)
 
+        # Apply the values written by the parent process
+        self._transport.timeout_add(10, self._input_queue_callback)
+
         # Initialise the advertisement
         self._advertisement.init_advertisement()
 
         # Register the application
-        service_manager.RegisterApplication(
-            app.get_path(),
-            {},
-            reply_handler=register_app_cb,
-            error_handler=register_app_error_cb,
-        )
+        self._transport.register_application(app)
 
         # Blocking call to run the main event loop
-        self._mainloop.run()
+        self._transport.run()
@@ -1,118 +1,81 @@
-from typing import Dict, Union
+from typing import Any, Dict
 
-import dbus
+from demo.core_ble.constants import LE_ADVERTISEMENT_IFACE
+from demo.core_ble.transport import Transport
+from demo.exceptions import InvalidArgsException
 
-from demo.core_ble.constants import (
-    DBUS_PROP_IFACE,
-    LE_ADVERTISEMENT_IFACE,
-    LE_ADVERTISING_MANAGER_IFACE,
-)
-from demo.exceptions import AdvertisementException, InvalidArgsException
 
-
-def register_ad_cb():
-    """
-    Callback for when the advertisement is registered.
-    """
-
-    print("Advertisement registered")
-
-
-def register_ad_error_cb(error: dbus.DBusException):
-    """
-    Callback for when there is an error registering the advertisement.
-
-    Args:
-        error (dbus.DBusException): error that occurred
-
-    Raises:
-        AdvertisementException: raised when there is an error registering the advertisement
-    """
-
-    print(f"Failed to register advertisement: {error}")
-    raise AdvertisementException()
-
-
-class Advertisement(dbus.service.Object):
+class Advertisement:
     """
     org.bluez.LEAdvertisement1 interface implementation
     """
 
     PATH_BASE = "/org/bluez/pycon_demo/advertisement"
 
-    def __init__(self, bus, index, adapter_obj, uuid, name):
+    def __init__(self, transport: Transport, index: int, uuid: str, name: str):
         self.path = self.PATH_BASE + str(index)
-        self.bus = bus
+        self.transport = transport
         self.ad_type = "peripheral"
         self.service_uuids = [uuid]
         self.solicit_uuids = None
         self.service_data = None
-        self.local_name = dbus.String(name)
+        self.local_name = name
         self.include_tx_power = None
-        self.manufacturer_data = {0xFFFF: dbus.Array([0x70, 0x74], signature="y")}
+        self.manufacturer_data = {0xFFFF: bytes([0x70, 0x74])}
         self.data = None
-        self.adapter_obj = adapter_obj
-        dbus.service.Object.__init__(self, bus, self.path)
+        transport.export(self)
 
     def init_advertisement(self):
         """
         Sets up and register the advertisement for the GATT server.
         """
-        ad_manager = dbus.Interface(self.adapter_obj, LE_ADVERTISING_MANAGER_IFACE)
-
-        ad_manager.RegisterAdvertisement(
-            self.get_path(),
-            {},
-            reply_handler=register_ad_cb,
-            error_handler=register_ad_error_cb,
-        )
+        self.transport.register_advertisement(self)
 
     def release(self) -> None:
         """
         Releases the advertisement.
         """
-        self.Release()
+        print(f"{self.path}: Released!")
 
-    def get_properties(self) -> Dict[str, Union[dbus.Array, dbus.Boolean, dbus.Dictionary]]:
+    def get_properties(self) -> Dict[str, Dict[str, Any]]:
         """
-        Create the dbus properties of the advertisement object.
+        Create the properties of the advertisement object.
 
         Returns:
-            Dict[str, Union[dbus.Array, dbus.Boolean, dbus.Dictionary]]: properties of the advertisement
+            Dict[str, Dict[str, Any]]: properties of the advertisement
         """
         properties = dict()
         properties["Type"] = self.ad_type
 
         if self.service_uuids is not None:
-            properties["ServiceUUIDs"] = dbus.Array(self.service_uuids, signature="s")
+            properties["ServiceUUIDs"] = self.service_uuids
         if self.solicit_uuids is not None:
-            properties["SolicitUUIDs"] = dbus.Array(self.solicit_uuids, signature="s")
+            properties["SolicitUUIDs"] = self.solicit_uuids
         if self.manufacturer_data is not None:
-            properties["ManufacturerData"] = dbus.Dictionary(self.manufacturer_data, signature="qv")
+            properties["ManufacturerData"] = self.manufacturer_data
         if self.service_data is not None:
-            properties["ServiceData"] = dbus.Dictionary(self.service_data, signature="sv")
+            properties["ServiceData"] = self.service_data
         if self.local_name is not None:
-            properties["LocalName"] = dbus.String(self.local_name)
+            properties["LocalName"] = self.local_name
         if self.include_tx_power is not None:
-            properties["IncludeTxPower"] = dbus.Boolean(self.include_tx_power)
+            properties["IncludeTxPower"] = self.include_tx_power
         if self.data is not None:
-            properties["Data"] = dbus.Dictionary(self.data, signature="yv")
+            properties["Data"] = self.data
 
         return {LE_ADVERTISEMENT_IFACE: properties}
 
-    def get_path(self) -> dbus.ObjectPath:
+    def get_path(self) -> str:
         """
         Return the object path of the advertisement.
 
         Returns:
-            dbus.ObjectPath: dbus path
+            str: object path
         """
-        return dbus.ObjectPath(self.path)
+        return self.path
 
-    @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
-    def GetAll(self, interface: str) -> Dict[str, Union[dbus.Array, dbus.Boolean, dbus.Dictionary]]:
+    def get_all(self, interface: str) -> Dict[str, Any]:
         """
-        Get all properties of the advertisement DBUS function.
+        Get all properties of the advertisement.
 
         Args:
             interface: name of interface
@@ -121,17 +84,9 @@ class Advertisement(dbus.service.Object):
             InvalidArgsException: wrong interface name
 
         Returns:
-            Dict[str, Union[dbus.Array, dbus.Boolean, dbus.Dictionary]]
+            Dict[str, Any]: properties of the interface
         """
         if interface != LE_ADVERTISEMENT_IFACE:
             raise InvalidArgsException()
 
         return self.get_properties()[LE_ADVERTISEMENT_IFACE]
-
-    @dbus.service.method(LE_ADVERTISEMENT_IFACE, in_signature="", out_signature="")
-    def Release(self):
-        """
-        Release the advertisement DBUS function.
-        """
-
-        print(f"{self.path}: Released!")
@@ -1,36 +1,43 @@
-from typing import Dict
+from typing import Any, Dict, Optional
 
-import dbus
-
-from demo.core_ble.constants import DBUS_OM_IFACE
+from demo.core_ble.scheduler import NotificationScheduler
 from demo.core_ble.service import Service
+from demo.core_ble.transport import Transport
+from demo.util import value_to_bytes
 
 
-class Application(dbus.service.Object):
+class Application:
     """
     org.bluez.GattApplication1 interface implementation.
     """
 
-    def __init__(self, system_bus: dbus.SystemBus) -> None:
+    PATH_BASE = "/org/bluez/pycon_demo/app"
+
+    def __init__(self, transport: Transport, index: Optional[int] = None) -> None:
         """
-        Constructor of application class. Set own path and initialize services variable.
+        Constructor of application class. Set own path and initialize services variable. The application owns the
+        notification scheduler of the connection, which has to be passed to all of its services.
 
         Args:
-            system_bus (dbus.SystemBus): system bus object
+            transport (Transport): transport the application is exported on
+            index (Optional[int]): index of the application, only needed if several applications share one
+                transport. If not set the application is exported at the root path.
         """
-        self.path = "/"
+        self.path = "/" if index is None else self.PATH_BASE + str(index)
         self.services = []
+        self.transport = transport
+        self.scheduler = NotificationScheduler(transport)
 
-        dbus.service.Object.__init__(self, system_bus, self.path)
+        transport.export(self)
 
     def get_path(self) -> str:
         """
-        Get dbus object path for given input path.
+        Get object path of the application.
 
         Returns:
-            str: dbus object path
+            str: object path
         """
-        return dbus.ObjectPath(self.path)
+        return self.path
 
     def add_service(self, service: Service) -> None:
         """
@@ -41,13 +48,43 @@ class Application(dbus.service.Object):
         """
         self.services.append(service)
 
-    @dbus.service.method(DBUS_OM_IFACE, out_signature="a{oa{sa{sv}}}")
-    def GetManagedObjects(self) -> Dict[str, dbus.ObjectPath]:
+    def write_many(self, values: Dict[str, Any]) -> None:
+        """
+        Writes values to characteristics of several services at once. All values are set before any notification is
+        sent, afterwards every scheduler sends the notifications of the batch back to back in one pass.
+
+        Args:
+            values (Dict[str, Any]): values to write by UUID of the characteristic
+
+        Raises:
+            ValueError: no service has a characteristic with one of the UUIDs or a value cannot be encoded, no value is
+                written in this case
+        """
+        values_by_service = {}
+        for uuid, value in values.items():
+            value = value_to_bytes(value)
+            for service in self.services:
+                if service.has_characteristic(uuid):
+                    values_by_service.setdefault(service, {})[uuid] = value
+                    break
+            else:
+                raise ValueError(f"unknown characteristic {uuid}")
+
+        batches = {}
+        for service, service_values in values_by_service.items():
+            service.write_many(service_values, dispatch=False)
+            batch = batches.setdefault(service.scheduler, [])
+            batch.extend(service.characteristics_by_uuid[uuid] for uuid in service_values)
+
+        for scheduler, batch in batches.items():
+            scheduler.dispatch(batch)
+
+    def get_managed_objects(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
         """
-        Overwrite GetManagedObjects to add all characteristics of the added services.
+        Returns the properties of all services, characteristics and descriptors of the application by object path.
 
         Returns:
-            Dict[str, dbus.ObjectPath]: all managed objects of this application
+            Dict[str, Dict[str, Dict[str, Any]]]: all managed objects of this application
         """
         response = {}
 
@@ -1,39 +1,97 @@
 import queue
 from typing import Any, Dict, List
 
-import dbus
-from gi.repository import GObject
-
-from demo.core_ble.constants import DBUS_PROP_IFACE, GATT_CHRC_IFACE
-from demo.core_ble.descriptor import Descriptor
-from demo.exceptions import InvalidArgsException
-from demo.util import byte_arr_to_str, str_to_byte_arr
-
-
-class Characteristic(dbus.service.Object):
+from demo.core_ble.codec import Codec
+from demo.core_ble.constants import GATT_CHRC_IFACE
+from demo.core_ble.descriptor import (
+    CodecDescriptor,
+    Descriptor,
+    PresentationFormatDescriptor,
+    UserDescriptionDescriptor,
+    ValidRangeDescriptor,
+)
+from demo.core_ble.transport import Transport
+from demo.exceptions import InvalidArgsException, InvalidOffsetException
+from demo.util import bytes_to_str, value_to_bytes
+
+
+class Characteristic:
     """
     org.bluez.GattCharacteristic1 interface implementation.
     """
 
-    def __init__(self, bus, index, uuid, flags, service, description, default_value, input_queue, output_queue):
+    def __init__(
+        self,
+        transport: Transport,
+        index,
+        uuid,
+        flags,
+        service,
+        description,
+        default_value,
+        input_queue,
+        output_queue,
+        priority=0,
+        rate=None,
+        max_latency=None,
+        codecs=None,
+        presentation_format=None,
+        valid_range=None,
+    ):
         self.path = service.path + "/char" + str(index)
-        self.bus = bus
+        self.transport = transport
         self.uuid = uuid
         self.service = service
         self.flags = flags
-        self.descriptors = [Descriptor(bus, 0, self, description)]
-
-        dbus.service.Object.__init__(self, bus, self.path)
-
-        self.value = str_to_byte_arr(default_value)
+        self.descriptors = [UserDescriptionDescriptor(transport, 0, self, description)]
+
+        if presentation_format is not None:
+            presentation_descriptor = PresentationFormatDescriptor(
+                transport, len(self.descriptors), self, **presentation_format
+            )
+            self.descriptors.append(presentation_descriptor)
+            if valid_range is not None:
+                self.descriptors.append(
+                    ValidRangeDescriptor(
+                        transport, len(self.descriptors), self, valid_range, presentation_descriptor.value_format
+                    )
+                )
+        elif valid_range is not None:
+            raise ValueError("valid range needs a presentation format")
+
+        # the codec stage is optional, without it values are sent as they are
+        self.codec = None
+        if codecs is not None:
+            self.codec = Codec(codecs)
+            self.descriptors.append(CodecDescriptor(transport, len(self.descriptors), self))
+
+        transport.export(self)
+
+        self.value = value_to_bytes(default_value)
         self.input_queue = input_queue
         self.output_queue = output_queue
-        self.notification_timeout_id = None
+        self.scheduler = service.scheduler
+        self.subscriber_count = 0
+        self._read_cache = (None, None, None)
+
+        self.scheduler.register(self, priority, rate, max_latency)
 
-        if "notify" in self.flags:
-            self.notifying = True
-        else:
-            self.notifying = False
+    @property
+    def notifying(self) -> bool:
+        """
+        Whether at least one client is subscribed to notifications of the characteristic.
+        """
+        return self.subscriber_count > 0
+
+    def wants_value(self) -> bool:
+        """
+        Returns whether a new value would be observed by anyone, i.e. the characteristic is readable or has subscribers.
+        Producers can use this to skip creating values nobody listens to.
+
+        Returns:
+            bool: True if a new value is read or notified.
+        """
+        return self.subscriber_count > 0 or "read" in self.flags
 
     def get_properties(self) -> Dict[str, Dict[str, Any]]:
         """ "
@@ -48,39 +106,108 @@ class Characteristic(dbus.service.Object):
                 "Service": self.service.get_path(),
                 "UUID": self.uuid,
                 "Flags": self.flags,
-                "Descriptors": dbus.Array(self.get_descriptor_paths(), signature="o"),
+                "Descriptors": self.get_descriptor_paths(),
             }
         }
 
-    def input_queue_callback(self):
+    def drain_input_queue(self) -> bool:
         """
-        Callback function for the input queue. This function is called every 10ms to check if there is a new value in the input queue.
-        If there is a new value, it is written to the characteristic and a PropertiesChanged signal is emitted.
+        Takes all values from the input queue and sets the latest one as value of the characteristic. This function is
+        called by the scheduler on every tick, older values that were not sent yet are dropped. Only the latest value
+        is encoded, if it cannot be encoded it is dropped as well and the previous value is kept.
+
+        Returns:
+            bool: True if the value of the characteristic changed.
         """
+        curr_value = None
+        changed = False
+
+        while True:
+            try:
+                curr_value = self.input_queue.get(False)
+            except queue.Empty:
+                break
+            changed = True
+
+        if not changed or not self.wants_value():
+            return False
 
         try:
-            curr_value = self.input_queue.get(False)
-        except queue.Empty:
-            return self.notifying
+            self.value = value_to_bytes(curr_value)
+        except ValueError as error:
+            print(f"Failed to set value of characteristic {self.uuid}: {error}")
+            return False
+        return True
+
+    def update_value(self, value: Any) -> bool:
+        """
+        Sets a new value on the characteristic and hands it to the scheduler if the characteristic is notifying.
+        Values that nobody can observe are dropped without encoding them. Has to be called from the process that runs
+        the main loop.
+
+        Args:
+            value (Any): The new value of the characteristic, bytes or a value whose string is ascii.
+
+        Raises:
+            ValueError: If the value cannot be encoded, the previous value is kept in this case.
+
+        Returns:
+            bool: True if a notification was scheduled.
+        """
+        if not self.wants_value():
+            return False
+
+        self.value = value_to_bytes(value)
+
+        if not self.notifying:
+            return False
+
+        self.scheduler.submit(self)
+        return True
+
+    def encoded_value(self, device: Any = None) -> bytes:
+        """
+        Returns the value of the characteristic encoded for a read with the codec of the given client. The encoded value
+        is cached until the value or the codec changes.
+
+        Args:
+            device (Any): The reading client as passed by BlueZ in the options.
+
+        Returns:
+            bytes: The encoded value of the characteristic.
+        """
+        if self.codec is None:
+            return self.value
+
+        active = self.codec.active(device)
+        value, cached_active, encoded = self._read_cache
+        if value is not self.value or cached_active != active:
+            encoded = self.codec.encode(self.value, active)
+            self._read_cache = (self.value, active, encoded)
+        return encoded
 
-        self.value = str_to_byte_arr(str(curr_value))
-        self.PropertiesChanged(GATT_CHRC_IFACE, {"Value": self.value}, [])
+    def notify(self):
+        """
+        Notifies the subscribers about the current value of the characteristic. Called by the scheduler. The value is
+        sent unencoded, as all subscribers get the same notification.
+        """
+        self.transport.emit_properties_changed(self, GATT_CHRC_IFACE, {"Value": self.value})
 
-    def get_path(self) -> dbus.ObjectPath:
+    def get_path(self) -> str:
         """ "
         Returns the path of the characteristic.
 
         Returns:
-            dbus.ObjectPath: The path of the characteristic.
+            str: The path of the characteristic.
         """
-        return dbus.ObjectPath(self.path)
+        return self.path
 
-    def get_descriptor_paths(self) -> List[dbus.ObjectPath]:
+    def get_descriptor_paths(self) -> List[str]:
         """
         Returns a list of all the paths of the descriptors of the characteristic.
 
         Returns:
-            List[dbus.ObjectPath]: A list of all the paths of the descriptors of the characteristic.
+            List[str]: A list of all the paths of the descriptors of the characteristic.
         """
         result = []
         for desc in self.descriptors:
@@ -96,8 +223,7 @@ class Characteristic(dbus.service.Object):
         """
         return self.descriptors
 
-    @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
-    def GetAll(self, interface) -> Dict[str, Any]:
+    def get_all(self, interface) -> Dict[str, Any]:
         """
         Returns a dictionary of all the properties of the characteristic.
 
@@ -112,43 +238,61 @@ class Characteristic(dbus.service.Object):
 
         return self.get_properties()[GATT_CHRC_IFACE]
 
-    @dbus.service.method(GATT_CHRC_IFACE, in_signature="a{sv}", out_signature="ay")
-    def ReadValue(self, options: Dict[str, Any]) -> Any:
+    def read_value(self, options: Dict[str, Any]) -> bytes:
         """
-        Returns the value of the characteristic.
+        Returns the value of the characteristic. Long values are read in several parts, each starting at the
+        offset given in the options.
 
         Args:
             options (Dict[str, Any]): A dictionary of options.
 
+        Raises:
+            InvalidOffsetException: If the offset is behind the end of the value.
+
         Returns:
-            Any: The value of the characteristic.
+            bytes: The value of the characteristic.
         """
-        return self.value
+        value = self.encoded_value(options.get("device"))
+        offset = int(options.get("offset", 0))
 
-    @dbus.service.method(GATT_CHRC_IFACE, in_signature="aya{sv}")
-    def WriteValue(self, value: Any, options: Dict[str, Any]):
+        if offset == 0:
+            return value
+        if offset > len(value):
+            raise InvalidOffsetException()
+        return value[offset:]
+
+    def write_value(self, value: bytes, options: Dict[str, Any]):
         """
-        Writes a value to the characteristic.
+        Writes a value to the characteristic. If the writing client selected a codec the value is decoded first. If the write pool of the
+        service has a handler for the characteristic the write is acknowledged right away and the value is handled by
+        the pool.
+
+        Args:
+            value (bytes): The written value.
+            options (Dict[str, Any]): A dictionary of options.
         """
+        if self.codec is not None:
+            value = self.codec.decode(options.get("device"), value)
+
         self.value = value
-        self.output_queue.put({"uuid": self.uuid, "value": byte_arr_to_str(value)})
 
-    @dbus.service.method(GATT_CHRC_IFACE)
-    def StartNotify(self):
-        """
-        Set the characteristic to notifying.
-        """
-        if self.notifying:
+        write_pool = self.service.write_pool
+        if write_pool is not None and write_pool.handles(self.uuid):
+            write_pool.submit(self.uuid, value)
             return
 
-        self.notifying = True
-        self.notification_timeout_id = GObject.timeout_add(10, self.input_queue_callback)
+        self.output_queue.put({"uuid": self.uuid, "value": bytes_to_str(value)})
 
-    @dbus.service.method(GATT_CHRC_IFACE)
-    def StopNotify(self):
+    def start_notify(self):
         """
-        Set the characteristic to not notifying.
+        Subscribe a client to notifications of the characteristic.
         """
+        self.subscriber_count += 1
 
-        self.notifying = False
-        GObject.source_remove(self.notification_timeout_id)
+    def stop_notify(self):
+        """
+        Unsubscribe a client from notifications of the characteristic. Once no client is subscribed anymore pending
+        values are dropped by the scheduler.
+        """
+        if self.subscriber_count > 0:
+            self.subscriber_count -= 1
@@ -0,0 +1,181 @@
+import struct
+import zlib
+from typing import Any, Dict, List
+
+from demo.exceptions import FailedException, InvalidArgsException
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+CODEC_IDENTITY = 0
+CODEC_ZLIB = 1
+CODEC_LZ4 = 2
+CODEC_DELTA = 3
+
+# Every encoded value starts with the id of the codec that encoded it and the length of the decoded value
+FRAME_HEADER = struct.Struct("<BI")
+# A delta frame holds the length of the prefix and suffix it shares with the previous value, followed by the middle part
+DELTA_HEADER = struct.Struct("<II")
+
+
+def available_codecs() -> List[int]:
+    """
+    Returns the ids of all codecs that can be used, lz4 is only available if the lz4 package is installed.
+
+    Returns:
+        List[int]: ids of the available codecs
+    """
+    codecs = [CODEC_IDENTITY, CODEC_ZLIB, CODEC_DELTA]
+    if lz4 is not None:
+        codecs.append(CODEC_LZ4)
+    return codecs
+
+
+class Codec:
+    """
+    Codec stage between the byte arrays that are exchanged with a client and the value of a characteristic. Every
+    client negotiates its own codec, clients are told apart by the device BlueZ passes in the options. As long as a
+    client has not selected a codec its values are passed through unchanged, so clients that do not know about codecs
+    are not affected. All other codecs prefix the value with a FRAME_HEADER.
+
+    Notifications go to all subscribers at once, so they are never encoded. The delta codec decodes the writes of a
+    client against the previous value written by the same client, reads are sent as full frames.
+    """
+
+    def __init__(self, supported: List[int]) -> None:
+        """
+        Constructor of the codec.
+
+        Args:
+            supported (List[int]): ids of the codecs a client may select
+
+        Raises:
+            ValueError: unknown or unavailable codec id
+        """
+        for codec_id in supported:
+            if codec_id not in available_codecs():
+                raise ValueError(f"codec {codec_id} is not available")
+
+        self.supported = [CODEC_IDENTITY] + [codec_id for codec_id in supported if codec_id != CODEC_IDENTITY]
+        self._active: Dict[Any, int] = {}
+        self._write_bases: Dict[Any, bytes] = {}
+
+    def active(self, device: Any) -> int:
+        """
+        Returns the codec the given client selected.
+
+        Args:
+            device (Any): client as passed by BlueZ in the options, None if unknown
+
+        Returns:
+            int: id of the codec
+        """
+        return self._active.get(device, CODEC_IDENTITY)
+
+    def select(self, device: Any, codec_id: int) -> None:
+        """
+        Activates the given codec for a client. The next delta written by the client has to be a full frame.
+
+        Args:
+            device (Any): client as passed by BlueZ in the options, None if unknown
+            codec_id (int): id of the codec
+
+        Raises:
+            InvalidArgsException: the codec is not supported by the characteristic
+        """
+        if codec_id not in self.supported:
+            raise InvalidArgsException()
+
+        if codec_id == CODEC_IDENTITY:
+            self._active.pop(device, None)
+        else:
+            self._active[device] = codec_id
+        self._write_bases.pop(device, None)
+
+    def encode(self, data: bytes, codec_id: int) -> bytes:
+        """
+        Encodes a value for a read. The delta codec sends full frames for reads.
+
+        Args:
+            data (bytes): value of the characteristic
+            codec_id (int): id of the codec the reading client selected
+
+        Returns:
+            bytes: encoded value
+        """
+        if codec_id == CODEC_IDENTITY:
+            return data
+        if codec_id == CODEC_ZLIB:
+            return FRAME_HEADER.pack(CODEC_ZLIB, len(data)) + zlib.compress(data)
+        if codec_id == CODEC_LZ4:
+            return FRAME_HEADER.pack(CODEC_LZ4, len(data)) + lz4.frame.compress(data)
+
+        return FRAME_HEADER.pack(CODEC_IDENTITY, len(data)) + data
+
+    def decode(self, device: Any, frame: bytes) -> bytes:
+        """
+        Decodes a value written by a client with the codec the client selected.
+
+        Args:
+            device (Any): client as passed by BlueZ in the options, None if unknown
+            frame (bytes): encoded value
+
+        Raises:
+            FailedException: the frame is corrupt or uses a codec that is not supported
+
+        Returns:
+            bytes: decoded value
+        """
+        if self.active(device) == CODEC_IDENTITY:
+            return frame
+
+        if len(frame) < FRAME_HEADER.size:
+            raise FailedException()
+
+        codec_id, length = FRAME_HEADER.unpack_from(frame)
+        body = frame[FRAME_HEADER.size :]
+
+        try:
+            if codec_id == CODEC_IDENTITY:
+                data = body
+            elif codec_id == CODEC_ZLIB and codec_id in self.supported:
+                data = self._decompress(zlib.decompressobj(), body, length)
+            elif codec_id == CODEC_LZ4 and codec_id in self.supported:
+                data = self._decompress(lz4.frame.LZ4FrameDecompressor(), body, length)
+            elif codec_id == CODEC_DELTA and codec_id in self.supported and device in self._write_bases:
+                data = self._apply_delta(self._write_bases[device], body)
+            else:
+                raise FailedException()
+        except (zlib.error, RuntimeError, struct.error):
+            raise FailedException()
+
+        if len(data) != length:
+            raise FailedException()
+
+        self._write_bases[device] = data
+        return data
+
+    @staticmethod
+    def _decompress(decompressor: Any, body: bytes, length: int) -> bytes:
+        """
+        Decompresses body with a zlib or lz4 decompressor, but stops one byte after the length given in the header, so a
+        small frame cannot make the main loop inflate a huge value.
+        """
+        data = decompressor.decompress(body, length + 1)
+        if len(data) > length or not decompressor.eof:
+            raise FailedException()
+
+        return data
+
+    @staticmethod
+    def _apply_delta(base: bytes, body: bytes) -> bytes:
+        """
+        Rebuilds a value from the prefix and suffix it shares with base and the middle part in the body.
+        """
+        prefix, suffix = DELTA_HEADER.unpack_from(body)
+        if prefix + suffix > len(base):
+            raise FailedException()
+
+        return base[:prefix] + body[DELTA_HEADER.size :] + base[len(base) - suffix :]
@@ -10,3 +10,29 @@ GATT_DESC_IFACE = "org.bluez.GattDescriptor1"
 
 LE_ADVERTISEMENT_IFACE = "org.bluez.LEAdvertisement1"
 LE_ADVERTISING_MANAGER_IFACE = "org.bluez.LEAdvertisingManager1"
+
+USER_DESC_UUID = "2901"
+PRESENTATION_FORMAT_DESC_UUID = "2904"
+VALID_RANGE_DESC_UUID = "2906"
+
+# Characteristic presentation formats and the struct formats their values are encoded with
+FORMAT_UINT8 = 0x04
+FORMAT_UINT16 = 0x06
+FORMAT_UINT32 = 0x08
+FORMAT_SINT8 = 0x0C
+FORMAT_SINT16 = 0x0E
+FORMAT_SINT32 = 0x10
+FORMAT_FLOAT32 = 0x14
+FORMAT_UTF8 = 0x19
+FORMAT_STRUCTS = {
+    FORMAT_UINT8: "<B",
+    FORMAT_UINT16: "<H",
+    FORMAT_UINT32: "<I",
+    FORMAT_SINT8: "<b",
+    FORMAT_SINT16: "<h",
+    FORMAT_SINT32: "<i",
+    FORMAT_FLOAT32: "<f",
+}
+
+# Vendor specific descriptor that allows clients to select the codec of a characteristic value
+CODEC_DESC_UUID = "f76ce015-952b-c6a8-e17c-c2c19aacc0de"
@@ -0,0 +1,388 @@
+from typing import Any, Callable, Dict, List, Optional
+
+import dbus
+import dbus.exceptions
+import dbus.mainloop.glib
+import dbus.proxies
+import dbus.service
+from gi.repository import GLib
+
+from demo.core_ble.advertisement import Advertisement
+from demo.core_ble.application import Application
+from demo.core_ble.characteristic import Characteristic
+from demo.core_ble.constants import (
+    BLUEZ_SERVICE_NAME,
+    DBUS_OM_IFACE,
+    DBUS_PROP_IFACE,
+    GATT_CHRC_IFACE,
+    GATT_DESC_IFACE,
+    GATT_MANAGER_IFACE,
+    LE_ADVERTISEMENT_IFACE,
+    LE_ADVERTISING_MANAGER_IFACE,
+)
+from demo.core_ble.descriptor import Descriptor
+from demo.core_ble.service import Service
+from demo.core_ble.transport import Transport
+from demo.exceptions import (
+    AdvertisementException,
+    BluetoothNotFoundException,
+    GattException,
+)
+
+# dbus types of the properties that are not plain strings, booleans or lists of strings
+_PROPERTY_CONVERTERS = {
+    "Service": dbus.ObjectPath,
+    "Characteristic": dbus.ObjectPath,
+    "Descriptors": lambda paths: dbus.Array(paths, signature="o"),
+    "characteristics": lambda paths: dbus.Array(paths, signature="o"),
+    "ServiceUUIDs": lambda uuids: dbus.Array(uuids, signature="s"),
+    "SolicitUUIDs": lambda uuids: dbus.Array(uuids, signature="s"),
+    "ManufacturerData": lambda data: dbus.Dictionary(
+        {key: dbus.ByteArray(value) for key, value in data.items()}, signature="qv"
+    ),
+    "ServiceData": lambda data: dbus.Dictionary({key: dbus.ByteArray(value) for key, value in data.items()}, signature="sv"),
+    "Data": lambda data: dbus.Dictionary({key: dbus.ByteArray(value) for key, value in data.items()}, signature="yv"),
+    "LocalName": dbus.String,
+    "IncludeTxPower": dbus.Boolean,
+    "Value": dbus.ByteArray,
+}
+
+
+def find_adapter(bus: dbus.Bus) -> Optional[str]:
+    """
+    Find the BlueZ adapter object.
+
+    Args:
+        bus (dbus.Bus): bus object
+
+    Returns:
+        Optional[str]: path of the main adapter if found
+    """
+    remote_om = dbus.Interface(bus.get_object(BLUEZ_SERVICE_NAME, "/"), DBUS_OM_IFACE)
+    objects = remote_om.GetManagedObjects()
+
+    for o, props in objects.items():
+        if GATT_MANAGER_IFACE in props.keys():
+            return o
+
+    return None
+
+
+def to_dbus_properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Converts the properties of a model object to dbus types.
+
+    Args:
+        properties (Dict[str, Any]): properties of one interface
+
+    Returns:
+        Dict[str, Any]: properties with dbus types
+    """
+    return {
+        key: _PROPERTY_CONVERTERS[key](value) if key in _PROPERTY_CONVERTERS else value for key, value in properties.items()
+    }
+
+
+def to_dbus_exception(error: GattException) -> dbus.exceptions.DBusException:
+    """
+    Converts an error of a model object to the dbus exception BlueZ expects.
+
+    Args:
+        error (GattException): error raised by the model
+
+    Returns:
+        dbus.exceptions.DBusException: dbus exception with the error name of the error
+    """
+    return dbus.exceptions.DBusException(str(error), name=error._dbus_error_name)
+
+
+def register_app_cb():
+    print("Bluetooth service registered")
+
+
+def register_app_error_cb(error):
+    print("Failed to register application: " + str(error))
+
+
+def register_ad_cb():
+    """
+    Callback for when the advertisement is registered.
+    """
+
+    print("Advertisement registered")
+
+
+def register_ad_error_cb(error: dbus.DBusException):
+    """
+    Callback for when there is an error registering the advertisement.
+
+    Args:
+        error (dbus.DBusException): error that occurred
+
+    Raises:
+        AdvertisementException: raised when there is an error registering the advertisement
+    """
+
+    print(f"Failed to register advertisement: {error}")
+    raise AdvertisementException()
+
+
+class DBusObject(dbus.service.Object):
+    """
+    Exports a model object on the bus and forwards the org.freedesktop.DBus.Properties calls to it.
+    """
+
+    def __init__(self, bus: dbus.Bus, model: Any) -> None:
+        self.model = model
+        dbus.service.Object.__init__(self, bus, model.get_path())
+
+    @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
+    def GetAll(self, interface: str) -> Dict[str, Any]:
+        """
+        Returns all properties of the given interface.
+
+        Args:
+            interface (str): The interface of the properties.
+
+        Returns:
+            Dict[str, Any]: All the properties of the interface.
+        """
+        try:
+            return to_dbus_properties(self.model.get_all(interface))
+        except GattException as error:
+            raise to_dbus_exception(error)
+
+    @dbus.service.signal(DBUS_PROP_IFACE, signature="sa{sv}as")
+    def PropertiesChanged(self, interface: str, changed: Dict[str, Any], invalidated: List[str]):
+        """
+        Signal that is emitted when properties of the object change.
+
+        Args:
+            interface (str): The interface of the changed properties.
+            changed (Dict[str, Any]): The changed properties and their new values.
+            invalidated (List[str]): The names of the invalidated properties.
+        """
+
+
+class DBusApplication(dbus.service.Object):
+    """
+    org.bluez.GattApplication1 interface of an Application on the bus.
+    """
+
+    def __init__(self, bus: dbus.Bus, model: Application) -> None:
+        self.model = model
+        dbus.service.Object.__init__(self, bus, model.get_path())
+
+    @dbus.service.method(DBUS_OM_IFACE, out_signature="a{oa{sa{sv}}}")
+    def GetManagedObjects(self) -> Dict[dbus.ObjectPath, Dict[str, Dict[str, Any]]]:
+        """
+        Returns all services, characteristics and descriptors of the application.
+
+        Returns:
+            Dict[dbus.ObjectPath, Dict[str, Dict[str, Any]]]: all managed objects of this application
+        """
+        response = {}
+
+        for path, interfaces in self.model.get_managed_objects().items():
+            response[dbus.ObjectPath(path)] = {
+                interface: to_dbus_properties(properties) for interface, properties in interfaces.items()
+            }
+
+        return response
+
+
+class DBusService(DBusObject):
+    """
+    org.bluez.GattService1 interface of a Service on the bus.
+    """
+
+
+class DBusCharacteristic(DBusObject):
+    """
+    org.bluez.GattCharacteristic1 interface of a Characteristic on the bus.
+    """
+
+    @dbus.service.method(GATT_CHRC_IFACE, in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options: Dict[str, Any]) -> dbus.ByteArray:
+        """
+        Returns the value of the characteristic.
+        """
+        try:
+            return dbus.ByteArray(self.model.read_value(options))
+        except GattException as error:
+            raise to_dbus_exception(error)
+
+    @dbus.service.method(GATT_CHRC_IFACE, in_signature="aya{sv}", byte_arrays=True)
+    def WriteValue(self, value: bytes, options: Dict[str, Any]):
+        """
+        Writes a value to the characteristic.
+        """
+        try:
+            self.model.write_value(bytes(value), options)
+        except GattException as error:
+            raise to_dbus_exception(error)
+
+    @dbus.service.method(GATT_CHRC_IFACE)
+    def StartNotify(self):
+        """
+        Subscribe a client to notifications of the characteristic.
+        """
+        self.model.start_notify()
+
+    @dbus.service.method(GATT_CHRC_IFACE)
+    def StopNotify(self):
+        """
+        Unsubscribe a client from notifications of the characteristic.
+        """
+        self.model.stop_notify()
+
+
+class DBusDescriptor(DBusObject):
+    """
+    org.bluez.GattDescriptor1 interface of a Descriptor on the bus.
+    """
+
+    @dbus.service.method(GATT_DESC_IFACE, in_signature="a{sv}", out_signature="ay")
+    def ReadValue(self, options: Dict[str, Any]) -> dbus.ByteArray:
+        """
+        Returns the value of the descriptor.
+        """
+        try:
+            return dbus.ByteArray(self.model.read_value(options))
+        except GattException as error:
+            raise to_dbus_exception(error)
+
+    @dbus.service.method(GATT_DESC_IFACE, in_signature="aya{sv}", byte_arrays=True)
+    def WriteValue(self, value: bytes, options: Dict[str, Any]):
+        """
+        Writes a value to the descriptor.
+        """
+        try:
+            self.model.write_value(bytes(value), options)
+        except GattException as error:
+            raise to_dbus_exception(error)
+
+
+class DBusAdvertisement(DBusObject):
+    """
+    org.bluez.LEAdvertisement1 interface of an Advertisement on the bus.
+    """
+
+    @dbus.service.method(LE_ADVERTISEMENT_IFACE, in_signature="", out_signature="")
+    def Release(self):
+        """
+        Release the advertisement DBUS function.
+        """
+        self.model.release()
+
+
+class DBusTransport(Transport):
+    """
+    Transport that exports the GATT model over dbus-python to BlueZ and runs a GLib main loop.
+    """
+
+    def __init__(self, bus: dbus.Bus) -> None:
+        """
+        Constructor of the dbus transport.
+
+        Args:
+            bus (dbus.Bus): bus the objects are exported on, usually the system bus
+        """
+        self.bus = bus
+        self._objects = {}
+        self._adapter_obj = None
+        self._mainloop = GLib.MainLoop()
+
+    def _get_adapter_obj(self) -> dbus.proxies.ProxyObject:
+        """
+        Returns the BlueZ adapter object.
+
+        Raises:
+            BluetoothNotFoundException: no adapter was found
+
+        Returns:
+            dbus.proxies.ProxyObject: adapter object
+        """
+        if self._adapter_obj is None:
+            adapter = find_adapter(self.bus)
+
+            if not adapter:
+                raise BluetoothNotFoundException()
+
+            self._adapter_obj = self.bus.get_object(bus_name=BLUEZ_SERVICE_NAME, object_path=adapter)
+        return self._adapter_obj
+
+    def export(self, obj: Any) -> None:
+        if isinstance(obj, Application):
+            dbus_object = DBusApplication(self.bus, obj)
+        elif isinstance(obj, Service):
+            dbus_object = DBusService(self.bus, obj)
+        elif isinstance(obj, Characteristic):
+            dbus_object = DBusCharacteristic(self.bus, obj)
+        elif isinstance(obj, Descriptor):
+            dbus_object = DBusDescriptor(self.bus, obj)
+        elif isinstance(obj, Advertisement):
+            dbus_object = DBusAdvertisement(self.bus, obj)
+        else:
+            raise ValueError(f"can not export {type(obj).__name__}")
+
+        self._objects[obj.get_path()] = dbus_object
+
+    def emit_properties_changed(self, obj: Any, interface: str, changed: Dict[str, Any]) -> None:
+        self._objects[obj.get_path()].PropertiesChanged(interface, to_dbus_properties(changed), [])
+
+    def register_application(self, application: Application) -> None:
+        service_manager = dbus.Interface(self._get_adapter_obj(), GATT_MANAGER_IFACE)
+
+        service_manager.RegisterApplication(
+            application.get_path(),
+            {},
+            reply_handler=register_app_cb,
+            error_handler=register_app_error_cb,
+        )
+
+    def register_advertisement(self, advertisement: Advertisement) -> None:
+        ad_manager = dbus.Interface(self._get_adapter_obj(), LE_ADVERTISING_MANAGER_IFACE)
+
+        ad_manager.RegisterAdvertisement(
+            advertisement.get_path(),
+            {},
+            reply_handler=register_ad_cb,
+            error_handler=register_ad_error_cb,
+        )
+
+    def timeout_add(self, interval: int, callback: Callable[[], bool]) -> int:
+        return GLib.timeout_add(interval, callback)
+
+    def source_remove(self, source_id: int) -> None:
+        GLib.source_remove(source_id)
+
+    def run(self) -> None:
+        # The mainloop handles the asynchronous communication over dbus documentation can be found
+        # here: https://docs.gtk.org/glib/main-loop.html
+        self._mainloop.run()
+
+    def quit(self) -> None:
+        self._mainloop.quit()
+
+
+def create_dbus_transport(bus_type: str = "system") -> DBusTransport:
+    """
+    Sets the GLib main loop as default main loop of dbus-python and creates a transport on the given bus. Import this
+    module in the process that runs the main loop, so other processes and the memory transport do not need dbus-python.
+
+    Args:
+        bus_type (str): "system" to export the objects to BlueZ or "session" to export them to a BlueZ mock on the
+            session bus
+
+    Raises:
+        ValueError: unknown bus type
+
+    Returns:
+        DBusTransport: transport on the bus
+    """
+    if bus_type not in ["system", "session"]:
+        raise ValueError("unknown bus type")
+
+    dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+    return DBusTransport(dbus.SystemBus() if bus_type == "system" else dbus.SessionBus())
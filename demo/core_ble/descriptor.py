@@ -1,26 +1,47 @@
-from typing import Any, Dict
-
-import dbus
-
-from demo.core_ble.constants import DBUS_PROP_IFACE, GATT_DESC_IFACE
-from demo.exceptions import InvalidArgsException
-from demo.util import str_to_byte_arr
-
-
-class Descriptor(dbus.service.Object):
+import struct
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from demo.core_ble.constants import (
+    CODEC_DESC_UUID,
+    FORMAT_STRUCTS,
+    GATT_DESC_IFACE,
+    PRESENTATION_FORMAT_DESC_UUID,
+    USER_DESC_UUID,
+    VALID_RANGE_DESC_UUID,
+)
+from demo.core_ble.transport import Transport
+from demo.exceptions import (
+    InvalidArgsException,
+    InvalidValueLengthException,
+    NotPermittedException,
+)
+
+# Characteristic Presentation Format: format, exponent, unit, name space and description
+PRESENTATION_FORMAT = struct.Struct("<BbHBH")
+# Name space of the units and descriptions defined by the Bluetooth SIG
+SIG_NAMESPACE = 0x01
+
+
+class Descriptor:
     """
     org.bluez.GattDescriptor1 interface implementation
+
+    The value of a descriptor is static, so it is encoded once when the descriptor is created and every read returns
+    the same immutable bytes. The Client Characteristic Configuration descriptor is not part of this: BlueZ
+    creates it for every notifying characteristic and calls StartNotify/StopNotify when clients subscribe.
     """
 
-    def __init__(self, bus, index, characteristic, description):
+    def __init__(
+        self, transport: Transport, index, characteristic, uuid: str, value: bytes, flags: Optional[List[str]] = None
+    ):
         self.path = characteristic.path + "/desc" + str(index)
-        self.bus = bus
-        self.uuid = "2901"
-        self.flags = ["read"]
+        self.transport = transport
+        self.uuid = uuid
+        self.flags = flags or ["read"]
         self.characteristic = characteristic
-        dbus.service.Object.__init__(self, bus, self.path)
+        transport.export(self)
 
-        self.value = str_to_byte_arr(description)
+        self.value = bytes(value)
 
     def get_properties(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -37,17 +58,16 @@ class Descriptor(dbus.service.Object):
             }
         }
 
-    def get_path(self) -> dbus.ObjectPath:
+    def get_path(self) -> str:
         """
         Returns the path of the descriptor.
 
         Returns:
-            dbus.ObjectPath: The path of the descriptor.
+            str: The path of the descriptor.
         """
-        return dbus.ObjectPath(self.path)
+        return self.path
 
-    @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
-    def GetAll(self, interface) -> Dict[str, Any]:
+    def get_all(self, interface) -> Dict[str, Any]:
         """
         Returns all the properties of the descriptor.
 
@@ -66,8 +86,7 @@ class Descriptor(dbus.service.Object):
 
         return self.get_properties()[GATT_DESC_IFACE]
 
-    @dbus.service.method(GATT_DESC_IFACE, in_signature="a{sv}", out_signature="ay")
-    def ReadValue(self, options) -> Any:
+    def read_value(self, options: Dict[str, Any]) -> bytes:
         """
         Returns the value of the descriptor.
 
@@ -75,6 +94,103 @@ class Descriptor(dbus.service.Object):
             options (Dict[str, Any]): A dictionary of options.
 
         Returns:
-            Any: The value of the descriptor.
+            bytes: The value of the descriptor.
         """
         return self.value
+
+    def write_value(self, value: bytes, options: Dict[str, Any]):
+        """
+        Writes the value of the descriptor, the values of static descriptors can not be written.
+
+        Args:
+            value (bytes): The written value.
+            options (Dict[str, Any]): A dictionary of options.
+
+        Raises:
+            NotPermittedException: Always, the descriptor is read only.
+        """
+        raise NotPermittedException()
+
+
+class UserDescriptionDescriptor(Descriptor):
+    """
+    Characteristic User Description descriptor (0x2901) holding a human readable description.
+    """
+
+    def __init__(self, transport: Transport, index, characteristic, description: str):
+        super().__init__(transport, index, characteristic, USER_DESC_UUID, description.encode("utf-8"))
+
+
+class PresentationFormatDescriptor(Descriptor):
+    """
+    Characteristic Presentation Format descriptor (0x2904) that describes how the value of the characteristic is
+    encoded, see the FORMAT_* constants.
+    """
+
+    def __init__(self, transport: Transport, index, characteristic, value_format: int, exponent: int = 0, unit: int = 0x2700):
+        self.value_format = value_format
+        value = PRESENTATION_FORMAT.pack(value_format, exponent, unit, SIG_NAMESPACE, 0)
+        super().__init__(transport, index, characteristic, PRESENTATION_FORMAT_DESC_UUID, value)
+
+
+class ValidRangeDescriptor(Descriptor):
+    """
+    Valid Range descriptor (0x2906) holding the lower and upper bound of the value, encoded in the value format of
+    the characteristic.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        index,
+        characteristic,
+        valid_range: Tuple[Union[int, float], Union[int, float]],
+        value_format,
+    ):
+        if value_format not in FORMAT_STRUCTS:
+            raise ValueError("valid range needs a numeric presentation format")
+
+        value_struct = struct.Struct(FORMAT_STRUCTS[value_format])
+        value = value_struct.pack(valid_range[0]) + value_struct.pack(valid_range[1])
+        super().__init__(transport, index, characteristic, VALID_RANGE_DESC_UUID, value)
+
+
+class CodecDescriptor(Descriptor):
+    """
+    Vendor specific descriptor to negotiate the codec of a characteristic. Reading it returns the id of the codec the
+    client selected followed by the ids of all supported codecs, writing a single codec id activates that codec for
+    the writing client only.
+    """
+
+    def __init__(self, transport: Transport, index, characteristic):
+        super().__init__(transport, index, characteristic, CODEC_DESC_UUID, b"", ["read", "write"])
+
+    def read_value(self, options: Dict[str, Any]) -> bytes:
+        """
+        Returns the codec of the reading client and the supported codecs of the characteristic.
+
+        Args:
+            options (Dict[str, Any]): A dictionary of options.
+
+        Returns:
+            bytes: The active codec id followed by the supported codec ids.
+        """
+        codec = self.characteristic.codec
+        return bytes([codec.active(options.get("device"))] + codec.supported)
+
+    def write_value(self, value: bytes, options: Dict[str, Any]):
+        """
+        Activates the written codec for the writing client.
+
+        Args:
+            value (bytes): The id of the codec.
+            options (Dict[str, Any]): A dictionary of options.
+
+        Raises:
+            InvalidValueLengthException: If the value is not a single byte.
+            InvalidArgsException: If the codec is not supported by the characteristic.
+        """
+        if len(value) != 1:
+            raise InvalidValueLengthException()
+
+        self.characteristic.codec.select(options.get("device"), value[0])
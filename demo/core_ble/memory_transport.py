@@ -0,0 +1,121 @@
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from demo.core_ble.transport import Transport
+
+
+class MemoryTransport(Transport):
+    """
+    Transport that keeps the GATT model in memory without any bus. Clients call the model objects directly, see
+    get_object(), and notifications are passed to the registered handlers. It has its own main loop for the timers,
+    which makes it usable for microbenchmarks, fuzzing and tests on machines without dbus or BlueZ.
+    """
+
+    def __init__(self) -> None:
+        self.objects: Dict[str, Any] = {}
+        self.applications = []
+        self.advertisements = []
+        self.emitted_count = 0
+
+        self._handlers: List[Callable[[str, str, Dict[str, Any]], None]] = []
+        self._timers = []
+        self._timer_ids = itertools.count(1)
+        self._removed = set()
+        self._running = False
+
+    def get_object(self, path: str) -> Any:
+        """
+        Returns the model object that is exported under the given path.
+
+        Args:
+            path (str): object path
+
+        Returns:
+            Any: model object
+        """
+        return self.objects[path]
+
+    def add_properties_changed_handler(self, handler: Callable[[str, str, Dict[str, Any]], None]) -> None:
+        """
+        Adds a handler that is called with the path, interface and changed properties of every emitted change.
+
+        Args:
+            handler (Callable[[str, str, Dict[str, Any]], None]): handler to call
+        """
+        self._handlers.append(handler)
+
+    def export(self, obj: Any) -> None:
+        self.objects[obj.get_path()] = obj
+
+    def emit_properties_changed(self, obj: Any, interface: str, changed: Dict[str, Any]) -> None:
+        self.emitted_count += 1
+        for handler in self._handlers:
+            handler(obj.get_path(), interface, changed)
+
+    def register_application(self, application: Any) -> None:
+        # read the objects like BlueZ does, so broken models fail on registration as well
+        application.get_managed_objects()
+        self.applications.append(application)
+
+    def register_advertisement(self, advertisement: Any) -> None:
+        advertisement.get_properties()
+        self.advertisements.append(advertisement)
+
+    def timeout_add(self, interval: int, callback: Callable[[], bool]) -> int:
+        source_id = next(self._timer_ids)
+        heapq.heappush(self._timers, (time.monotonic() + interval / 1000, source_id, interval, callback))
+        return source_id
+
+    def source_remove(self, source_id: int) -> None:
+        self._removed.add(source_id)
+
+    def iterate(self, now: Optional[float] = None) -> int:
+        """
+        Runs all timers that are due.
+
+        Args:
+            now (Optional[float]): monotonic time to run the timers for, defaults to the current time
+
+        Returns:
+            int: number of timers that were run
+        """
+        now = time.monotonic() if now is None else now
+        due_timers = []
+
+        while self._timers and self._timers[0][0] <= now:
+            due_timers.append(heapq.heappop(self._timers))
+
+        count = 0
+        for _, source_id, interval, callback in due_timers:
+            if source_id in self._removed:
+                self._removed.discard(source_id)
+                continue
+
+            count += 1
+            # like GLib the timer is rearmed relative to the time it ran at
+            if callback():
+                heapq.heappush(self._timers, (now + interval / 1000, source_id, interval, callback))
+
+        return count
+
+    def run(self, duration: Optional[float] = None) -> None:
+        """
+        Runs the timers until quit() is called or the duration is over.
+
+        Args:
+            duration (Optional[float]): seconds to run, runs until quit() if not set
+        """
+        end = None if duration is None else time.monotonic() + duration
+        self._running = True
+
+        while self._running and (end is None or time.monotonic() < end):
+            self.iterate()
+            if self._timers:
+                time.sleep(max(0.0, min(self._timers[0][0] - time.monotonic(), 0.001)))
+            else:
+                time.sleep(0.001)
+
+    def quit(self) -> None:
+        self._running = False
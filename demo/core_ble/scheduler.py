@@ -0,0 +1,208 @@
+import math
+import time
+from typing import Dict, List, Optional
+
+from demo.core_ble.transport import Transport
+
+# Bytes an ATT Handle Value Notification adds to the value (opcode and attribute handle)
+ATT_NOTIFICATION_OVERHEAD = 3
+# Default ATT MTU, a notification can carry at most ATT_DEFAULT_MTU - ATT_NOTIFICATION_OVERHEAD bytes of the value
+ATT_DEFAULT_MTU = 23
+# Conservative estimate of the bytes per second that fit through one connection
+DEFAULT_LINK_RATE = 8000.0
+# Interval in ms in which the scheduler sends pending notifications
+DEFAULT_TICK_INTERVAL = 10
+
+
+class ScheduledCharacteristic:
+    """
+    Scheduling state of one characteristic.
+    """
+
+    def __init__(self, characteristic, priority: int, rate: Optional[float], max_latency: Optional[float]):
+        self.characteristic = characteristic
+        self.priority = priority
+        self.rate = rate
+        self.max_latency = max_latency
+        # a burst of one notification allows to send the first value right away
+        self.tokens = 1.0
+        self.pending_since = None
+
+    @property
+    def deadline(self) -> float:
+        """
+        Returns the time until which the pending value has to be sent.
+
+        Returns:
+            float: deadline as monotonic time, infinite if the characteristic has no maximum latency
+        """
+        if self.max_latency is None:
+            return math.inf
+        return self.pending_since + self.max_latency
+
+
+class NotificationScheduler:
+    """
+    Scheduler that owns the pending notifications of all characteristics of one connection. Instead of one timer per
+    characteristic a single timer sends the pending values in order of their deadlines and priorities, limited by a
+    token bucket per characteristic and one for the capacity of the link. Values that change faster than they can be
+    sent are coalesced, so only the latest value of a characteristic is notified.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        link_rate: float = DEFAULT_LINK_RATE,
+        mtu: int = ATT_DEFAULT_MTU,
+        tick_interval: int = DEFAULT_TICK_INTERVAL,
+    ) -> None:
+        """
+        Constructor of the scheduler.
+
+        Args:
+            transport (Transport): transport that runs the timer of the scheduler
+            link_rate (float): bytes per second that may be sent over the link including the ATT overhead
+            mtu (int): ATT MTU of the connection
+            tick_interval (int): interval in ms in which pending notifications are sent
+        """
+        self.transport = transport
+        self.link_rate = link_rate
+        self.mtu = mtu
+        self.tick_interval = tick_interval
+        # the link may burst the bytes of one tick but at least one full notification
+        self.link_burst = max(float(mtu), link_rate * tick_interval / 1000)
+        self.link_tokens = self.link_burst
+        self.sent_count = 0
+
+        self._entries: Dict[str, ScheduledCharacteristic] = {}
+        self._last_tick = time.monotonic()
+        self._timeout_id = None
+
+    def register(self, characteristic, priority: int = 0, rate: Optional[float] = None, max_latency: Optional[float] = None):
+        """
+        Registers a characteristic at the scheduler and starts the scheduler timer if necessary.
+
+        Args:
+            characteristic (Characteristic): characteristic to schedule
+            priority (int): characteristics with a higher priority are sent first
+            rate (Optional[float]): maximum notifications per second of the characteristic, unlimited if not set
+            max_latency (Optional[float]): seconds after which a pending value is sent before values of higher priority
+        """
+        if rate is not None and rate <= 0:
+            raise ValueError("rate has to be positive")
+
+        self._entries[characteristic.path] = ScheduledCharacteristic(characteristic, priority, rate, max_latency)
+
+        if self._timeout_id is None:
+            self._last_tick = time.monotonic()
+            self._timeout_id = self.transport.timeout_add(self.tick_interval, self._tick)
+
+    def unregister(self, characteristic) -> None:
+        """
+        Removes a characteristic from the scheduler and stops the scheduler timer if no characteristic is left.
+
+        Args:
+            characteristic (Characteristic): characteristic to remove
+        """
+        self._entries.pop(characteristic.path, None)
+
+        if not self._entries and self._timeout_id is not None:
+            self.transport.source_remove(self._timeout_id)
+            self._timeout_id = None
+
+    def submit(self, characteristic) -> None:
+        """
+        Marks the current value of a characteristic as pending. If a value is already pending it is replaced but keeps
+        its original deadline.
+
+        Args:
+            characteristic (Characteristic): characteristic with a new value
+        """
+        entry = self._entries[characteristic.path]
+        if entry.pending_since is None:
+            entry.pending_since = time.monotonic()
+
+    def _cost(self, entry: ScheduledCharacteristic) -> int:
+        """
+        Returns the bytes a notification of the characteristic occupies on the link.
+        """
+        value_length = min(len(entry.characteristic.value), self.mtu - ATT_NOTIFICATION_OVERHEAD)
+        return value_length + ATT_NOTIFICATION_OVERHEAD
+
+    def dispatch(self, batch: Optional[List] = None) -> int:
+        """
+        Sends the pending notifications that fit into the current link and characteristic budgets. Overdue values are
+        sent first, then values by priority and deadline. Values that do not fit are skipped so that smaller values
+        can still use the remaining capacity of the link.
+
+        Pending values of the characteristics in batch are sent in this pass in any case. Their cost is charged to the
+        budgets as one unit, which may overdraw them, so later notifications wait until the link has caught up.
+
+        Args:
+            batch (Optional[List]): characteristics whose pending values have to be sent back to back
+
+        Returns:
+            int: number of notifications sent
+        """
+        batch_paths = set() if batch is None else {characteristic.path for characteristic in batch}
+        now = time.monotonic()
+        elapsed = now - self._last_tick
+        self._last_tick = now
+
+        self.link_tokens = min(self.link_burst, self.link_tokens + elapsed * self.link_rate)
+
+        candidates = []
+        for entry in self._entries.values():
+            if entry.rate is not None:
+                entry.tokens = min(1.0, entry.tokens + elapsed * entry.rate)
+
+            if entry.characteristic.drain_input_queue() and entry.characteristic.notifying:
+                self.submit(entry.characteristic)
+
+            if entry.pending_since is None:
+                continue
+            if not entry.characteristic.notifying:
+                entry.pending_since = None
+                continue
+            if entry.rate is not None and entry.tokens < 1.0 and entry.characteristic.path not in batch_paths:
+                continue
+
+            candidates.append(entry)
+
+        # the batch goes first, so other values cannot take the budget it needs
+        candidates.sort(
+            key=lambda e: (
+                e.characteristic.path not in batch_paths,
+                e.deadline > now,
+                -e.priority,
+                e.deadline,
+                e.pending_since,
+            )
+        )
+
+        sent = 0
+        for entry in candidates:
+            cost = self._cost(entry)
+            if cost > self.link_tokens and entry.characteristic.path not in batch_paths:
+                continue
+
+            self.link_tokens -= cost
+            if entry.rate is not None:
+                entry.tokens -= 1.0
+            entry.pending_since = None
+
+            entry.characteristic.notify()
+            sent += 1
+
+        self.sent_count += sent
+        return sent
+
+    def _tick(self) -> bool:
+        """
+        Timer callback of the scheduler.
+
+        Returns:
+            bool: True to keep the timer running
+        """
+        self.dispatch()
+        return True
@@ -1,31 +1,35 @@
 import queue
-from typing import Any, Dict, List
-
-import dbus
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from demo.core_ble.characteristic import Characteristic
-from demo.core_ble.constants import DBUS_PROP_IFACE, GATT_SERVICE_IFACE
+from demo.core_ble.constants import GATT_SERVICE_IFACE
+from demo.core_ble.transport import Transport
 from demo.exceptions import InvalidArgsException
-from demo.util import check_flags
+from demo.util import check_flags, value_to_bytes
 
 
-class Service(dbus.service.Object):
+class Service:
     """
     org.bluez.GattService1 interface implementation
     """
 
     PATH_BASE = "/org/bluez/example/service"
 
-    def __init__(self, bus, index, uuid, primary, output_queue):
-        self.path = self.PATH_BASE + str(index)
-        self.bus = bus
+    def __init__(self, transport: Transport, index, uuid, primary, output_queue, scheduler, path_base=None, write_pool=None):
+        self.path = (path_base or self.PATH_BASE) + str(index)
+        self.transport = transport
         self.uuid = uuid
         self.primary = primary
         self.characteristics = []
-        dbus.service.Object.__init__(self, bus, self.path)
+        transport.export(self)
 
         self.characteristic_queues = {}
+        self.characteristics_by_uuid = {}
         self.output_queue = output_queue
+        # scheduler of the connection, usually the one of the application, so all services share one link budget
+        self.scheduler = scheduler
+        # optional WriteWorkerPool that handles the writes to characteristics outside of the main loop
+        self.write_pool = write_pool
 
     def get_properties(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -38,20 +42,32 @@ class Service(dbus.service.Object):
             GATT_SERVICE_IFACE: {
                 "UUID": self.uuid,
                 "Primary": self.primary,
-                "characteristics": dbus.Array(self.get_characteristic_paths(), signature="o"),
+                "characteristics": self.get_characteristic_paths(),
             }
         }
 
-    def get_path(self) -> dbus.ObjectPath:
+    def get_path(self) -> str:
         """
         Returns the path of the service.
 
         Returns:
-            dbus.ObjectPath: The path of the service.
+            str: The path of the service.
         """
-        return dbus.ObjectPath(self.path)
-
-    def add_characteristic(self, uuid: str, flags: List[str], description: str, default_value: Any):
+        return self.path
+
+    def add_characteristic(
+        self,
+        uuid: str,
+        flags: List[str],
+        description: str,
+        default_value: Any,
+        priority: int = 0,
+        rate: Optional[float] = None,
+        max_latency: Optional[float] = None,
+        codecs: Optional[List[int]] = None,
+        presentation_format: Optional[Dict[str, int]] = None,
+        valid_range: Optional[Tuple[Union[int, float], Union[int, float]]] = None,
+    ):
         """
         Adds a characteristic to the service.
 
@@ -60,13 +76,22 @@ class Service(dbus.service.Object):
             flags (List[str]): The flags of the characteristic.
             description (str): The description of the characteristic.
             default_value (Any): The default value of the characteristic.
+            priority (int): The notification priority of the characteristic, higher values are sent first.
+            rate (Optional[float]): The maximum notifications per second of the characteristic.
+            max_latency (Optional[float]): The seconds after which a pending notification is sent before all others.
+            codecs (Optional[List[int]]): The codecs a client may select for the value, see demo.core_ble.codec. If
+                set a codec descriptor is added to the characteristic.
+            presentation_format (Optional[Dict[str, int]]): The value_format, exponent and unit of the presentation
+                format descriptor, see the FORMAT_* constants. No presentation format descriptor is added if not set.
+            valid_range (Optional[Tuple[Union[int, float], Union[int, float]]]): The lower and upper bound of the valid
+                range descriptor, requires a numeric presentation format.
         """
         check_flags(flags)
 
         self.characteristic_queues[uuid] = queue.Queue()
 
         characteristic = Characteristic(
-            self.bus,
+            self.transport,
             len(self.characteristics),
             uuid,
             flags,
@@ -75,26 +100,96 @@ class Service(dbus.service.Object):
             default_value,
             self.characteristic_queues[uuid],
             self.output_queue,
+            priority,
+            rate,
+            max_latency,
+            codecs,
+            presentation_format,
+            valid_range,
         )
 
         self.characteristics.append(characteristic)
+        self.characteristics_by_uuid[uuid] = characteristic
 
     def write_to_characteristic(self, value: Any, uuid: str):
         """
-        Writes a value to a specified characteristic.
+        Writes a value to a specified characteristic. The value is dropped right away if nobody can observe it.
 
         Args:
-            value (Any): The value to write to the characteristic.
+            value (Any): The value to write to the characteristic, bytes or a value whose string is ascii.
             uuid (str): The UUID of the characteristic to write to.
+
+        Raises:
+            ValueError: If the value cannot be encoded.
+        """
+        if not self.characteristics_by_uuid[uuid].wants_value():
+            return
+
+        self.characteristic_queues[uuid].put(value_to_bytes(value))
+
+    def has_subscribers(self, uuid: str) -> bool:
+        """
+        Returns whether any client is subscribed to notifications of a characteristic.
+
+        Args:
+            uuid (str): The UUID of the characteristic.
+
+        Returns:
+            bool: True if at least one client is subscribed.
+        """
+        return self.characteristics_by_uuid[uuid].notifying
+
+    def write_many(self, values: Dict[str, Any], dispatch: bool = True):
+        """
+        Writes values to several characteristics at once. All values are set before any notification is sent and the
+        notifications are sent back to back in one pass of the scheduler, even if they exceed the link budget of the
+        pass. Values still waiting in the input queues of these characteristics are older and dropped. Has to be
+        called from the process that runs the main loop, use BLEProcess.write_many from other processes.
+
+        Args:
+            values (Dict[str, Any]): The values to write by UUID of the characteristic.
+            dispatch (bool): Whether to send the notifications right away instead of on the next scheduler tick.
+
+        Raises:
+            ValueError: If the service has no characteristic with one of the UUIDs or a value cannot be encoded, no
+                value is written in this case.
+        """
+        for uuid in values:
+            if uuid not in self.characteristics_by_uuid:
+                raise ValueError(f"unknown characteristic {uuid}")
+
+        # encode all values first, so a value that cannot be encoded does not leave the batch half applied
+        encoded_values = {uuid: value_to_bytes(value) for uuid, value in values.items()}
+
+        characteristics = []
+        for uuid, value in encoded_values.items():
+            characteristic = self.characteristics_by_uuid[uuid]
+            # the queued values would otherwise be drained by the scheduler and overwrite the new value
+            characteristic.drain_input_queue()
+            characteristic.update_value(value)
+            characteristics.append(characteristic)
+
+        if dispatch:
+            self.scheduler.dispatch(characteristics)
+
+    def has_characteristic(self, uuid: str) -> bool:
+        """
+        Returns whether the service has a characteristic with the given UUID.
+
+        Args:
+            uuid (str): The UUID of the characteristic.
+
+        Returns:
+            bool: True if the characteristic belongs to the service.
         """
-        self.characteristic_queues[uuid].put(value)
+        return uuid in self.characteristics_by_uuid
 
-    def get_characteristic_paths(self) -> List[dbus.ObjectPath]:
+    def get_characteristic_paths(self) -> List[str]:
         """
         Returns the paths of the characteristics.
 
         Returns:
-            List[dbus.ObjectPath]: The paths of the characteristics.
+            List[str]: The paths of the characteristics.
         """
         result = []
         for characteristic in self.characteristics:
@@ -110,8 +205,7 @@ class Service(dbus.service.Object):
         """
         return self.characteristics
 
-    @dbus.service.method(DBUS_PROP_IFACE, in_signature="s", out_signature="a{sv}")
-    def GetAll(self, interface) -> Dict[str, Any]:
+    def get_all(self, interface) -> Dict[str, Any]:
         """
         Returns all the properties of the service.
 
@@ -0,0 +1,85 @@
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict
+
+
+class Transport(ABC):
+    """
+    Interface between the GATT model (application, services, characteristics, descriptors and advertisements) and the
+    bus the model is exposed on. The model objects export themselves on the transport and use it for signals and
+    timers, the transport calls their methods when a client reads, writes or subscribes.
+
+    Model objects provide get_path(), get_properties() and the methods of their BlueZ interface in snake case, e.g.
+    read_value(), write_value(), start_notify() and stop_notify(). Values are passed as bytes.
+    """
+
+    @abstractmethod
+    def export(self, obj: Any) -> None:
+        """
+        Makes a model object available to clients under its path.
+
+        Args:
+            obj (Any): model object to export
+        """
+
+    @abstractmethod
+    def emit_properties_changed(self, obj: Any, interface: str, changed: Dict[str, Any]) -> None:
+        """
+        Notifies clients about changed properties of a model object.
+
+        Args:
+            obj (Any): model object whose properties changed
+            interface (str): interface of the changed properties
+            changed (Dict[str, Any]): changed properties and their new values
+        """
+
+    @abstractmethod
+    def register_application(self, application: Any) -> None:
+        """
+        Registers a GATT application at the Bluetooth stack.
+
+        Args:
+            application (Application): application to register
+        """
+
+    @abstractmethod
+    def register_advertisement(self, advertisement: Any) -> None:
+        """
+        Registers an advertisement at the Bluetooth stack.
+
+        Args:
+            advertisement (Advertisement): advertisement to register
+        """
+
+    @abstractmethod
+    def timeout_add(self, interval: int, callback: Callable[[], bool]) -> int:
+        """
+        Calls the callback every interval ms on the main loop as long as it returns True.
+
+        Args:
+            interval (int): interval in ms
+            callback (Callable[[], bool]): function to call
+
+        Returns:
+            int: id of the timer
+        """
+
+    @abstractmethod
+    def source_remove(self, source_id: int) -> None:
+        """
+        Stops a timer.
+
+        Args:
+            source_id (int): id of the timer
+        """
+
+    @abstractmethod
+    def run(self) -> None:
+        """
+        Runs the main loop until quit() is called.
+        """
+
+    @abstractmethod
+    def quit(self) -> None:
+        """
+        Stops the main loop.
+        """
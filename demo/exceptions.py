@@ -1,7 +1,14 @@
-import dbus.exceptions
+class GattException(Exception):
+    """
+    Base class of the errors a GATT object reports to the client. The transport translates them into its own error
+    type, the dbus transport uses the error name to create a dbus exception.
+
+    """
+
+    _dbus_error_name = "org.bluez.Error.Failed"
 
 
-class InvalidArgsException(dbus.exceptions.DBusException):
+class InvalidArgsException(GattException):
     """
     Invalid arg exception dbus uses for BLE communication
 
@@ -10,6 +17,42 @@ class InvalidArgsException(dbus.exceptions.DBusException):
     _dbus_error_name = "org.freedesktop.DBus.Error.InvalidArgs"
 
 
+class FailedException(GattException):
+    """
+    Generic failure exception BlueZ uses for GATT operations, e.g. when a written value can not be decoded
+
+    """
+
+    _dbus_error_name = "org.bluez.Error.Failed"
+
+
+class InvalidValueLengthException(GattException):
+    """
+    Exception BlueZ uses when a written value has the wrong length
+
+    """
+
+    _dbus_error_name = "org.bluez.Error.InvalidValueLength"
+
+
+class InvalidOffsetException(GattException):
+    """
+    Exception BlueZ uses when a read starts behind the end of the value
+
+    """
+
+    _dbus_error_name = "org.bluez.Error.InvalidOffset"
+
+
+class NotPermittedException(GattException):
+    """
+    Exception BlueZ uses when an operation is not allowed on a GATT object
+
+    """
+
+    _dbus_error_name = "org.bluez.Error.NotPermitted"
+
+
 class BluetoothNotFoundException(Exception):
     """
     This exception is thrown when an error with the Gatt service occurs, usually this happens when Bluetooth is off
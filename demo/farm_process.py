@@ -0,0 +1,297 @@
+import enum
+import itertools
+import queue
+import time
+from multiprocessing import Process
+from signal import SIGINT, SIGTERM, signal
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from demo.core_ble.advertisement import Advertisement
+from demo.core_ble.application import Application
+from demo.core_ble.memory_transport import MemoryTransport
+from demo.core_ble.service import Service
+from demo.core_ble.transport import Transport
+
+# GATT profile that every virtual device of the farm exposes if no other profile is given.
+DEFAULT_PROFILE = [
+    {
+        "uuid": "0000180d-aaaa-1000-8000-0081239b35fb",
+        "characteristics": [
+            {
+                "uuid": "f76ce015-952b-c6a8-e17c-c2c19aac7b1b",
+                "flags": ["read", "write"],
+                "description": "Test Characteristic",
+                "default_value": "Hello PyConDE",
+            },
+            {
+                "uuid": "f76ce015-952b-c6a8-e17c-c2c19aac7b1c",
+                "flags": ["read", "notify"],
+                "description": "Counter Characteristic",
+                "default_value": "0",
+            },
+        ],
+    }
+]
+
+
+def counter_generator(device_index: int) -> Iterator[int]:
+    """
+    Default value generator of the farm, counts up from zero for every device.
+
+    Args:
+        device_index (int): index of the virtual device the generator is created for
+
+    Returns:
+        Iterator[int]: endless counter
+    """
+    return itertools.count()
+
+
+class DeviceFarmProcess(Process):
+    """
+    Process that runs N virtual peripherals with the same GATT profile on one main loop. The values of the
+    characteristics are driven by generators at configurable rates, which allows to load test central-side software
+    and to measure how many devices and notifications per second a single core can handle.
+    """
+
+    def __init__(
+        self,
+        output_queue: queue.Queue,
+        device_count: int,
+        profile: Optional[List[Dict[str, Any]]] = None,
+        generators: Optional[Dict[str, Callable[[int], Iterator[Any]]]] = None,
+        rates: Optional[Dict[str, float]] = None,
+        default_rate: float = 10.0,
+        bus_type: str = "memory",
+        stats_interval: float = 5.0,
+        stats_queue: Optional[queue.Queue] = None,
+    ) -> None:
+        """
+        Constructor of the device farm.
+
+        Args:
+            output_queue (queue.Queue): queue that receives the values written by centrals to any device
+            device_count (int): number of virtual devices to create
+            profile (Optional[List[Dict[str, Any]]]): GATT profile of each device, defaults to DEFAULT_PROFILE
+            generators (Optional[Dict[str, Callable[[int], Iterator[Any]]]]): factories per characteristic UUID that
+                create the value iterator of one device. Notifying characteristics without a generator use
+                counter_generator.
+            rates (Optional[Dict[str, float]]): update rate in Hz per characteristic UUID
+            default_rate (float): update rate in Hz for characteristics that are not in rates
+            bus_type (str): "memory" to run the devices on the in-memory transport without any bus, "session" to run
+                against a BlueZ mock on the session bus, e.g. python-dbusmock, or "system" to run against BlueZ. BlueZ
+                exposes all applications of one adapter as a single peripheral, so the system bus only supports a
+                single device.
+            stats_interval (float): seconds between two statistics reports
+            stats_queue (Optional[queue.Queue]): queue that receives the statistics reports, they are printed if not set
+        """
+        super().__init__()
+
+        if device_count < 1:
+            raise ValueError("device_count has to be at least 1")
+        if bus_type not in ["system", "session", "memory"]:
+            raise ValueError("unknown bus type")
+        if bus_type == "system" and device_count > 1:
+            raise ValueError("the system bus only supports a single device per adapter")
+
+        self._output_queue = output_queue
+        self._device_count = device_count
+        self._profile = profile or DEFAULT_PROFILE
+        self._generators = generators or {}
+        self._rates = rates or {}
+        self._default_rate = default_rate
+        self._bus_type = bus_type
+        self._stats_interval = stats_interval
+        self._stats_queue = stats_queue
+
+        self._transport = None
+        self._advertisements = []
+        self._schedulers = []
+        self._update_count = 0
+        self._stats_start = 0.0
+
+    def _shutdown_handler(self, sig: enum, frame: enum) -> None:
+        """
+        Handler that stops the main loop and stops the advertisements of all devices.
+        """
+        self._transport.quit()
+        for advertisement in self._advertisements:
+            advertisement.release()
+
+    def _create_device(self, index: int) -> Application:
+        """
+        Creates one virtual device with its advertisement, application and the services of the profile.
+
+        Args:
+            index (int): index of the virtual device
+
+        Returns:
+            Application: application of the virtual device
+        """
+        advertisement = Advertisement(
+            transport=self._transport,
+            index=index,
+            uuid=self._profile[0]["uuid"],
+            name=f"pycon_demo_farm_{index}",
+        )
+        self._advertisements.append(advertisement)
+
+        app = Application(self._transport, index)
+
+        # every virtual device is a connection of its own, so it gets its own scheduler with its application
+        self._schedulers.append(app.scheduler)
+
+        for service_index, service_profile in enumerate(self._profile):
+            service = Service(
+                transport=self._transport,
+                index=service_index,
+                uuid=service_profile["uuid"],
+                primary=service_index == 0,
+                output_queue=self._output_queue,
+                path_base=app.path + "/service",
+                scheduler=app.scheduler,
+            )
+
+            for char_profile in service_profile["characteristics"]:
+                service.add_characteristic(
+                    char_profile["uuid"],
+                    char_profile["flags"],
+                    char_profile["description"],
+                    char_profile["default_value"],
+                    priority=char_profile.get("priority", 0),
+                    rate=char_profile.get("rate"),
+                    max_latency=char_profile.get("max_latency"),
+                )
+
+            app.add_service(service)
+
+        return app
+
+    def _create_driver(self, uuid: str, applications: List[Application]) -> None:
+        """
+        Creates the value iterators of one characteristic for all devices and registers a single timer that updates
+        the characteristic on every device per tick.
+
+        Args:
+            uuid (str): UUID of the characteristic
+            applications (List[Application]): applications of all virtual devices
+        """
+        generator_factory = self._generators.get(uuid, counter_generator)
+        targets = []
+
+        for index, app in enumerate(applications):
+            for service in app.services:
+                for characteristic in service.get_characteristics():
+                    if characteristic.uuid == uuid:
+                        targets.append((characteristic, generator_factory(index)))
+
+        rate = self._rates.get(uuid, self._default_rate)
+        if rate <= 0:
+            raise ValueError(f"rate of characteristic {uuid} has to be positive")
+
+        # timers have a millisecond resolution, so rates above 1 kHz are capped
+        interval = max(1, round(1000 / rate))
+
+        def tick() -> bool:
+            for characteristic, values in targets:
+                try:
+                    value = next(values)
+                except StopIteration:
+                    continue
+
+                self._update_count += 1
+                try:
+                    characteristic.update_value(value)
+                except ValueError as error:
+                    print(f"Failed to update characteristic {uuid}: {error}")
+            return True
+
+        self._transport.timeout_add(interval, tick)
+
+    def _report_stats(self) -> bool:
+        """
+        Reports the number of value updates and notifications per second since the last report.
+
+        Returns:
+            bool: True to keep the timer running
+        """
+        now = time.monotonic()
+        elapsed = now - self._stats_start
+        notification_count = 0
+        for scheduler in self._schedulers:
+            notification_count += scheduler.sent_count
+            scheduler.sent_count = 0
+
+        stats = {
+            "devices": self._device_count,
+            "updates_per_second": self._update_count / elapsed,
+            "notifications_per_second": notification_count / elapsed,
+        }
+
+        self._update_count = 0
+        self._stats_start = now
+
+        if self._stats_queue is not None:
+            self._stats_queue.put(stats)
+        else:
+            print(
+                f"Farm with {stats['devices']} devices: {stats['updates_per_second']:.0f} updates/s, "
+                f"{stats['notifications_per_second']:.0f} notifications/s"
+            )
+
+        return True
+
+    def _create_transport(self) -> Transport:
+        """
+        Creates the transport of the configured bus type.
+
+        Returns:
+            Transport: transport all devices are exported on
+        """
+        if self._bus_type == "memory":
+            return MemoryTransport()
+
+        # dbus is only needed if the farm runs on a bus
+        from demo.core_ble.dbus_transport import create_dbus_transport
+
+        return create_dbus_transport(self._bus_type)
+
+    def run(self) -> None:
+        """
+        The main run function that set-ups all virtual devices and drives their values.
+        """
+        # register shutdown handler
+        signal(SIGTERM, self._shutdown_handler)
+        signal(SIGINT, self._shutdown_handler)
+
+        self._transport = self._create_transport()
+
+        applications = [self._create_device(index) for index in range(self._device_count)]
+
+        for advertisement, app in zip(self._advertisements, applications):
+            advertisement.init_advertisement()
+            self._transport.register_application(app)
+
+        # without a bus there are no centrals, so every notifying characteristic gets one subscriber
+        if self._bus_type == "memory":
+            for app in applications:
+                for service in app.services:
+                    for characteristic in service.get_characteristics():
+                        if "notify" in characteristic.flags:
+                            characteristic.start_notify()
+
+        # only characteristics that can change on their own are driven by a generator
+        driven_uuids = set(self._generators.keys())
+        for service_profile in self._profile:
+            for char_profile in service_profile["characteristics"]:
+                if "notify" in char_profile["flags"]:
+                    driven_uuids.add(char_profile["uuid"])
+
+        for uuid in driven_uuids:
+            self._create_driver(uuid, applications)
+
+        self._stats_start = time.monotonic()
+        self._transport.timeout_add(round(self._stats_interval * 1000), self._report_stats)
+
+        # Blocking call to run the main event loop
+        self._transport.run()
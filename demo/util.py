@@ -1,12 +1,4 @@
-from typing import List, Optional
-
-import dbus
-
-from demo.core_ble.constants import (
-    BLUEZ_SERVICE_NAME,
-    DBUS_OM_IFACE,
-    GATT_MANAGER_IFACE,
-)
+from typing import Any, List
 
 
 def check_flags(flags: List[str]):
@@ -29,55 +21,45 @@ def check_flags(flags: List[str]):
             raise ValueError("unknown flag")
 
 
-def byte_arr_to_str(byte_array: dbus.Array) -> str:
+def bytes_to_str(data: bytes) -> str:
     """
-    Helper function that converts dbus byte array to an ascii string.
+    Helper function that converts bytes to an ascii string.
     Args:
-        byte_array (dbus.Array): Byte array to be decoded to a string
+        data (bytes): Bytes to be decoded to a string
+
+    Raises:
+        ValueError: the bytes are not ascii
 
     Returns:
-        str: converted byte array
+        str: converted bytes
     """
-    byte_list = [bytes([v]) for v in byte_array]
-    try:
-        decoded_list = [str(v, "ascii") for v in byte_list]
-        # Returns the array as a single string
-        final_string = "".join(decoded_list)
-    except Exception:
-        raise ValueError
-    return final_string
+    return data.decode("ascii")
 
 
-def str_to_byte_arr(text: str) -> dbus.Array:
+def str_to_bytes(text: str) -> bytes:
     """
-    Helper function that a string to dbus byte array using ascii encoding.
+    Helper function that converts a string to bytes using ascii encoding.
     Args:
-        text (String): String to convert to array
+        text (String): String to convert
     Returns:
-        dbus.Array: byte array
+        bytes: encoded string
     """
-
-    ascii_values = dbus.Array([], signature=dbus.Signature("y"))
-    for character in text:
-        ascii_values.append(dbus.Byte(ord(character)))
-    return ascii_values
+    return text.encode("ascii")
 
 
-def find_adapter(bus: dbus.SystemBus) -> Optional[dbus.service.Object]:
+def value_to_bytes(value: Any) -> bytes:
     """
-    Find the BlueZ adapter object.
-
+    Helper function that converts a characteristic value to bytes. Bytes are taken as they are, all other values are
+    converted to a string and encoded as ascii.
     Args:
-        bus (dbus.SystemBus): system bus object
+        value (Any): Value to convert
+
+    Raises:
+        ValueError: the string of the value is not ascii
 
     Returns:
-        Optional[dbus.Object]: main adapter if found
+        bytes: converted value
     """
-    remote_om = dbus.Interface(bus.get_object(BLUEZ_SERVICE_NAME, "/"), DBUS_OM_IFACE)
-    objects = remote_om.GetManagedObjects()
-
-    for o, props in objects.items():
-        if GATT_MANAGER_IFACE in props.keys():
-            return o
-
-    return None
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value)
+    return str_to_bytes(str(value))
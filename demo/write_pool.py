@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import queue
+import zlib
+from multiprocessing import Process
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class WriteWorker(Process):
+    """
+    Worker process that runs the write handlers for the UUIDs assigned to it in the order the writes arrived.
+    """
+
+    def __init__(
+        self,
+        handlers: Dict[str, Callable[[bytes], Any]],
+        input_queue: multiprocessing.Queue,
+        result_queue: multiprocessing.Queue,
+    ) -> None:
+        super().__init__(daemon=True)
+        self._handlers = handlers
+        self._input_queue = input_queue
+        self._result_queue = result_queue
+
+    def run(self) -> None:
+        """
+        Handles writes until None is received.
+        """
+        while True:
+            item = self._input_queue.get()
+            if item is None:
+                return
+
+            uuid, payload = item
+            try:
+                result = self._handlers[uuid](payload)
+            except Exception as error:
+                print(f"Write handler of characteristic {uuid} failed: {error}")
+                continue
+
+            self._result_queue.put((uuid, result))
+
+
+class WriteWorkerPool:
+    """
+    Pool of worker processes that handle the values written to characteristics. Characteristics with a handler
+    acknowledge writes right away and pass the payload to the pool instead of handling it on the main loop. All writes
+    to one UUID go to the same worker, so they are handled and their results are returned in the order they arrived.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[bytes], Any]], worker_count: Optional[int] = None) -> None:
+        """
+        Constructor of the pool.
+
+        Args:
+            handlers (Dict[str, Callable[[bytes], Any]]): handler per characteristic UUID. A handler gets the written
+                bytes and returns the result that is sent back, None if there is nothing to send. Handlers have to be
+                picklable, e.g. module level functions.
+            worker_count (Optional[int]): number of worker processes, defaults to the number of cores
+        """
+        self._handlers = handlers
+        self._worker_count = worker_count or os.cpu_count() or 1
+        self._input_queues: List[multiprocessing.Queue] = []
+        self._result_queue = multiprocessing.Queue()
+        self._workers: List[WriteWorker] = []
+
+    def start(self) -> None:
+        """
+        Starts the worker processes.
+        """
+        for _ in range(self._worker_count):
+            input_queue = multiprocessing.Queue()
+            worker = WriteWorker(self._handlers, input_queue, self._result_queue)
+            worker.start()
+
+            self._input_queues.append(input_queue)
+            self._workers.append(worker)
+
+    def stop(self) -> None:
+        """
+        Stops the worker processes after they handled all pending writes.
+        """
+        for input_queue in self._input_queues:
+            input_queue.put(None)
+        for worker in self._workers:
+            worker.join()
+
+        self._input_queues = []
+        self._workers = []
+
+    def handles(self, uuid: str) -> bool:
+        """
+        Returns whether the pool has a handler for the characteristic.
+
+        Args:
+            uuid (str): UUID of the characteristic
+
+        Returns:
+            bool: True if writes to the characteristic are handled by the pool
+        """
+        return uuid in self._handlers
+
+    def submit(self, uuid: str, payload: bytes) -> None:
+        """
+        Passes a written value to the worker of its characteristic.
+
+        Args:
+            uuid (str): UUID of the characteristic
+            payload (bytes): written value
+        """
+        # crc32 instead of hash() because it is stable across processes
+        worker_index = zlib.crc32(uuid.encode("ascii")) % len(self._input_queues)
+        self._input_queues[worker_index].put((uuid, payload))
+
+    def results(self) -> Iterator[Tuple[str, Any]]:
+        """
+        Returns the results that are available without blocking.
+
+        Returns:
+            Iterator[Tuple[str, Any]]: UUID of the characteristic and result of its handler
+        """
+        while True:
+            try:
+                yield self._result_queue.get(False)
+            except queue.Empty:
+                return
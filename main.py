@@ -1,18 +1,34 @@
+import argparse
 import multiprocessing
 import queue
 import time
 
-import dbus
-
 from demo.ble_process import BLEProcess
+from demo.farm_process import DeviceFarmProcess
+
 
-dbus.mainloop.glib.DBusGMainLoop(set_as_default=True)
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="PyConDE BLE demo peripheral")
+    parser.add_argument("--farm", type=int, default=0, help="run N virtual devices in one process instead of one device")
+    parser.add_argument("--rate", type=float, default=10.0, help="update rate in Hz of the virtual devices")
+    parser.add_argument("--system-bus", action="store_true", help="run a farm of one device against BlueZ")
+    parser.add_argument("--session-bus", action="store_true", help="run the farm against a BlueZ mock on the session bus")
+    return parser.parse_args()
 
 
 def main():
+    args = parse_args()
     output_queue = multiprocessing.Queue()
 
-    ble_process = BLEProcess(output_queue)
+    if args.farm:
+        ble_process = DeviceFarmProcess(
+            output_queue,
+            args.farm,
+            default_rate=args.rate,
+            bus_type="system" if args.system_bus else "session" if args.session_bus else "memory",
+        )
+    else:
+        ble_process = BLEProcess(output_queue)
     ble_process.start()
 
     while True:
@@ -0,0 +1,132 @@
+import queue
+import zlib
+
+import pytest
+
+from demo.core_ble.application import Application
+from demo.core_ble.codec import (
+    CODEC_DELTA,
+    CODEC_IDENTITY,
+    CODEC_ZLIB,
+    DELTA_HEADER,
+    FRAME_HEADER,
+)
+from demo.core_ble.descriptor import CodecDescriptor
+from demo.core_ble.memory_transport import MemoryTransport
+from demo.core_ble.service import Service
+from demo.exceptions import FailedException
+
+SERVICE_UUID = "0000180d-aaaa-1000-8000-0081239b35fb"
+CHARACTERISTIC_UUID = "f76ce015-952b-c6a8-e17c-c2c19aac7b1d"
+DEVICE_A = {"device": "/org/bluez/hci0/dev_00_00_00_00_00_0A"}
+DEVICE_B = {"device": "/org/bluez/hci0/dev_00_00_00_00_00_0B"}
+
+
+@pytest.fixture
+def characteristic():
+    """
+    Characteristic with the zlib and delta codec on the memory transport.
+    """
+    transport = MemoryTransport()
+    app = Application(transport)
+    service = Service(transport, 0, SERVICE_UUID, True, queue.Queue(), app.scheduler)
+    service.add_characteristic(
+        CHARACTERISTIC_UUID, ["read", "write", "notify"], "Config Characteristic", "", codecs=[CODEC_ZLIB, CODEC_DELTA]
+    )
+    app.add_service(service)
+    transport.register_application(app)
+
+    return service.characteristics_by_uuid[CHARACTERISTIC_UUID]
+
+
+def select_codec(characteristic, codec_id, options):
+    """
+    Selects a codec through the codec descriptor like a client does.
+    """
+    descriptor = next(d for d in characteristic.get_descriptors() if isinstance(d, CodecDescriptor))
+    descriptor.write_value(bytes([codec_id]), options)
+    return descriptor
+
+
+def test_zlib_round_trip(characteristic):
+    select_codec(characteristic, CODEC_ZLIB, DEVICE_A)
+    value = b'{"log": "' + b"x" * 4000 + b'"}'
+
+    characteristic.write_value(FRAME_HEADER.pack(CODEC_ZLIB, len(value)) + zlib.compress(value), DEVICE_A)
+    assert characteristic.value == value
+
+    frame = characteristic.read_value(DEVICE_A)
+    codec_id, length = FRAME_HEADER.unpack_from(frame)
+    assert codec_id == CODEC_ZLIB
+    assert length == len(value)
+    assert len(frame) < len(value)
+    assert zlib.decompress(frame[FRAME_HEADER.size :]) == value
+
+
+@pytest.mark.parametrize("length_offset", [-1, 1])
+def test_zlib_wrong_declared_length(characteristic, length_offset):
+    select_codec(characteristic, CODEC_ZLIB, DEVICE_A)
+    value = b"a" * 1000
+
+    with pytest.raises(FailedException):
+        characteristic.write_value(FRAME_HEADER.pack(CODEC_ZLIB, len(value) + length_offset) + zlib.compress(value), DEVICE_A)
+    assert characteristic.value == b""
+
+
+def test_zlib_bomb_is_rejected(characteristic):
+    select_codec(characteristic, CODEC_ZLIB, DEVICE_A)
+
+    with pytest.raises(FailedException):
+        characteristic.write_value(FRAME_HEADER.pack(CODEC_ZLIB, 16) + zlib.compress(bytes(16 << 20)), DEVICE_A)
+
+
+def test_delta_write(characteristic):
+    select_codec(characteristic, CODEC_DELTA, DEVICE_A)
+    characteristic.write_value(FRAME_HEADER.pack(CODEC_IDENTITY, 11) + b"temp=21.5C;", DEVICE_A)
+
+    # keeps "temp=2" and "C;" of the previous value
+    characteristic.write_value(FRAME_HEADER.pack(CODEC_DELTA, 11) + DELTA_HEADER.pack(6, 2) + b"2.0", DEVICE_A)
+    assert characteristic.value == b"temp=22.0C;"
+
+
+def test_delta_write_without_base(characteristic):
+    select_codec(characteristic, CODEC_DELTA, DEVICE_A)
+
+    with pytest.raises(FailedException):
+        characteristic.write_value(FRAME_HEADER.pack(CODEC_DELTA, 3) + DELTA_HEADER.pack(0, 0) + b"abc", DEVICE_A)
+
+
+def test_truncated_delta_header(characteristic):
+    select_codec(characteristic, CODEC_DELTA, DEVICE_A)
+    characteristic.write_value(FRAME_HEADER.pack(CODEC_IDENTITY, 5) + b"hello", DEVICE_A)
+
+    with pytest.raises(FailedException):
+        characteristic.write_value(FRAME_HEADER.pack(CODEC_DELTA, 5) + DELTA_HEADER.pack(1, 1)[:5], DEVICE_A)
+    assert characteristic.value == b"hello"
+
+
+def test_codec_per_device(characteristic):
+    descriptor = select_codec(characteristic, CODEC_ZLIB, DEVICE_A)
+    characteristic.write_value(b"plain", DEVICE_B)
+
+    assert descriptor.read_value(DEVICE_A)[0] == CODEC_ZLIB
+    assert descriptor.read_value(DEVICE_B)[0] == CODEC_IDENTITY
+    assert characteristic.read_value(DEVICE_B) == b"plain"
+    assert FRAME_HEADER.unpack_from(characteristic.read_value(DEVICE_A)) == (CODEC_ZLIB, 5)
+
+    # the delta base of one device is not used for another
+    select_codec(characteristic, CODEC_DELTA, DEVICE_B)
+    characteristic.write_value(FRAME_HEADER.pack(CODEC_IDENTITY, 5) + b"hello", DEVICE_B)
+    select_codec(characteristic, CODEC_DELTA, DEVICE_A)
+    with pytest.raises(FailedException):
+        characteristic.write_value(FRAME_HEADER.pack(CODEC_DELTA, 5) + DELTA_HEADER.pack(5, 0), DEVICE_A)
+
+
+def test_notifications_are_not_encoded(characteristic):
+    notified = []
+    characteristic.transport.add_properties_changed_handler(lambda path, interface, changed: notified.append(changed))
+    select_codec(characteristic, CODEC_ZLIB, DEVICE_A)
+    characteristic.start_notify()
+
+    characteristic.service.write_many({CHARACTERISTIC_UUID: "21.5"})
+    assert notified == [{"Value": b"21.5"}]